@@ -4,13 +4,24 @@ import logging
 import logging.handlers as handlers
 import random
 import sys
+from multiprocessing.connection import wait as waitConnections
 from pathlib import Path
+import multiprocessing
 import threading  
 
 from src import Browser, DailySet, Login, MorePromotions, PunchCards, Searches
 from src.constants import VERSION
 from src.loggingColoredFormatter import ColoredFormatter
+from src.blockingPolicy import PROFILE_DASHBOARD, PROFILE_QUIZ, PROFILE_SEARCH
+from src.checkpoint import CheckpointJournal, installSignalHandlers
+from src.daemon import Daemon
 from src.notifier import Notifier
+from src.scheduler import CooperativeScheduler
+from src.searchBackend import BACKEND_BROWSER, BACKEND_HTTP
+from src.searchScheduler import InterleavedSearches
+from src.searchTerms import getTermProvider
+from src import tracing
+from src.stageGraph import DESKTOP_BROWSER, HTTP_ONLY, MOBILE_BROWSER, StageGraph
 from src.utils import Utils
 from src.AppTasks import AppTasks  # 添加这一行导入
 
@@ -40,7 +51,8 @@ def setupConfig() -> dict:
             "pushplus_token": "your pushplus token",
             "target_point": 17925,
             "use_multithreading": False,
-            "enable_app_tasks": True
+            "enable_app_tasks": True,
+            "max_parallel_accounts": 1
         }
         configPath.write_text(
             json.dumps(default_config, indent=4),
@@ -59,8 +71,10 @@ def main():
     global config
     setupLogging()
     logging.info(f"{LOG_TAG} setupLogging done")
+    installSignalHandlers()
     # 调用新函数设置配置
     config = setupConfig()
+    tracing.configure(config.get("enable_tracing", False))
     # 根据配置决定是否添加 -v 参数
     if config.get("add_visible_flag", False) and '-v' not in sys.argv and '--visible' not in sys.argv:
         sys.argv.append('-v')
@@ -68,25 +82,178 @@ def main():
     logging.info(f"{LOG_TAG} argumentParser done")
     notifier = Notifier(args)
     loadedAccounts = setupAccounts()
+    if args.daemon:
+        runDaemon(notifier, args)
+        return
     logging.info(f"{LOG_TAG} setupAccounts done")
     logging.info(f"{LOG_TAG} loadedAccounts: {loadedAccounts}")
     # 定义一个变量来收集每个账号的结果
-    all_account_results = []
-    for currentAccount in loadedAccounts:
-        try:
-            account_result = executeBot(currentAccount, notifier, args)
+    # max_parallel_accounts大于1时，每个账号在独立的进程中执行，单个浏览器崩溃不会影响其他账号
+    # scheduler_mode为cooperative时，在单个进程中协作式调度多个账号，空闲等待期间执行其他账号的任务
+    max_parallel_accounts = int(config.get("max_parallel_accounts", 1) or 1)
+    if config.get("scheduler_mode") == "cooperative":
+        scheduler = CooperativeScheduler(config.get("max_active_accounts", 3))
+        logging.info(
+            f"{LOG_TAG} 使用协作式调度器执行账号，最大活跃账号数: {scheduler.maxActiveAccounts}"
+        )
+        all_account_results = scheduler.run(
+            loadedAccounts,
+            lambda currentAccount: runAccount(currentAccount, notifier, args),
+        )
+    elif max_parallel_accounts > 1 and len(loadedAccounts) > 1:
+        all_account_results = runAccountsInProcesses(
+            loadedAccounts, args, max_parallel_accounts
+        )
+    else:
+        all_account_results = []
+        for currentAccount in loadedAccounts:
+            account_result = runAccount(currentAccount, notifier, args)
             if account_result:
                 all_account_results.append(account_result)
-        except Exception as e:
-            logging.error(f"{e.__class__.__name__}: {e}")
-            account_result = f"{currentAccount.get('username', '未知账号')} 执行失败: {str(e)}"
-            all_account_results.append(account_result)
     # 拼接所有账号的结果信息
     result_message = "\n".join(all_account_results)
     notifier.wechat("执行完成", f"所有账号执行结果如下：\n{result_message}") # 改为默认正常情况不发信息，只有异常的时候发。
+    tracing.flush()
     logging.info(f"{LOG_TAG} 账号全部执行完成")
 
 
+def runAccount(
+    currentAccount, notifier: Notifier, args: argparse.Namespace, desktopBrowser: Browser = None
+) -> str:
+    """
+    执行单个账号的全部任务，异常时返回失败信息而不是抛出。
+
+    Returns:
+        str: 当前账号的执行结果。
+    """
+    try:
+        with tracing.span("account", "account", account=currentAccount.get("username")):
+            return executeBot(currentAccount, notifier, args, desktopBrowser)
+    except Exception as e:
+        logging.error(f"{e.__class__.__name__}: {e}")
+        return f"{currentAccount.get('username', '未知账号')} 执行失败: {str(e)}"
+
+
+def accountWorker(currentAccount, args: argparse.Namespace, resultConn, logQueue):
+    """
+    每个账号独立子进程的入口，子进程需要重新初始化日志和配置。
+    执行结果通过resultConn发送给父进程，日志通过logQueue交给父进程统一写入。
+    """
+    global config
+    setupWorkerLogging(logQueue)
+    installSignalHandlers()
+    config = setupConfig()
+    tracing.configure(config.get("enable_tracing", False))
+    notifier = Notifier(args)
+    try:
+        resultConn.send(runAccount(currentAccount, notifier, args))
+    finally:
+        tracing.flush()
+        resultConn.close()
+
+
+def runAccountsInProcesses(
+    loadedAccounts: list, args: argparse.Namespace, maxWorkers: int
+) -> list:
+    """
+    每个账号在独立的子进程中执行，最多同时运行maxWorkers个，每个账号完成后立即收集其结果。
+
+    子进程之间互不影响，某个账号的Chrome崩溃拖垮其子进程时（OOM、段错误、os._exit），
+    只有该账号执行失败，其他账号继续执行。
+
+    Args:
+        loadedAccounts (list): 账号列表。
+        args (argparse.Namespace): 命令行参数。
+        maxWorkers (int): 同时运行的最大账号数。
+
+    Returns:
+        list: 按完成顺序排列的每个账号的执行结果。
+    """
+    maxWorkers = min(maxWorkers, len(loadedAccounts))
+    logging.info(f"{LOG_TAG} 使用独立子进程并行执行账号，最大并行数: {maxWorkers}")
+    # 使用spawn方式创建子进程，保证Windows和Linux下行为一致，且不继承父进程中的浏览器句柄
+    context = multiprocessing.get_context("spawn")
+    # 子进程的日志统一由父进程写入，避免多个进程同时轮转同一个日志文件
+    logQueue = context.Queue()
+    listener = handlers.QueueListener(
+        logQueue, *logging.getLogger().handlers, respect_handler_level=True
+    )
+    listener.start()
+    pending = list(loadedAccounts)
+    # 进程的sentinel -> (进程, 结果管道, 账号)
+    running = {}
+    all_account_results = []
+    try:
+        while pending or running:
+            while pending and len(running) < maxWorkers:
+                currentAccount = pending.pop(0)
+                resultReader, resultWriter = context.Pipe(duplex=False)
+                process = context.Process(
+                    target=accountWorker,
+                    args=(currentAccount, args, resultWriter, logQueue),
+                )
+                process.start()
+                # 父进程不写入，关闭写端后子进程退出时读端才能收到EOF
+                resultWriter.close()
+                running[process.sentinel] = (process, resultReader, currentAccount)
+            for sentinel in waitConnections(list(running)):
+                process, resultReader, currentAccount = running.pop(sentinel)
+                process.join()
+                username = currentAccount.get("username", "未知账号")
+                account_result = None
+                try:
+                    if resultReader.poll():
+                        account_result = resultReader.recv()
+                except (EOFError, OSError):
+                    pass
+                finally:
+                    resultReader.close()
+                if account_result is None:
+                    # 子进程被意外终止（例如Chrome崩溃拖垮了整个进程），没有返回结果
+                    logging.error(f"{LOG_TAG} {username} 工作进程异常退出，退出码: {process.exitcode}")
+                    account_result = f"{username} 执行失败: 工作进程异常退出（退出码 {process.exitcode}）"
+                logging.info(f"{LOG_TAG} {username} 执行完成: {account_result}")
+                if account_result:
+                    all_account_results.append(account_result)
+    finally:
+        # 父进程被中断时结束还在运行的子进程，子进程收到SIGTERM后会先保存断点日志
+        for process, resultReader, _ in running.values():
+            process.terminate()
+            process.join()
+            resultReader.close()
+        listener.stop()
+    return all_account_results
+
+
+def runDaemon(notifier: Notifier, args: argparse.Namespace):
+    """
+    常驻运行，按每个账号配置的时间执行，并提前启动和登录浏览器。
+    """
+
+    def warmBrowser(currentAccount) -> Browser:
+        browser = Browser(mobile=False, account=currentAccount, args=args)
+        try:
+            Login(browser).login()
+        except Exception:
+            browser.closeBrowser()
+            raise
+        return browser
+
+    accountPath = Path(__file__).resolve().parent / "accounts.json"
+    # config.json修改后由Daemon原地更新全局的config，之后执行的账号使用新的配置
+    configPath = Path(__file__).resolve().parent / "config.json"
+    Daemon(
+        accountPath,
+        config,
+        notifier,
+        lambda currentAccount, desktopBrowser: runAccount(
+            currentAccount, notifier, args, desktopBrowser
+        ),
+        warmBrowser,
+        configPath,
+    ).run()
+
+
 def setupLogging():
     format = "%(asctime)s [%(levelname)s] %(message)s"
     terminalHandler = logging.StreamHandler(sys.stdout)
@@ -112,11 +279,25 @@ def setupLogging():
     )
 
 
+def setupWorkerLogging(logQueue):
+    """子进程中只把日志记录交给父进程，由父进程写入终端和日志文件。"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(handlers.QueueHandler(logQueue))
+    root.setLevel(logging.INFO)
+
+
 def argumentParser() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Microsoft Rewards Farmer")
     parser.add_argument(
         "-v", "--visible", action="store_true", help="Optional: Visible browser"
     )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Optional: Stay resident and run each account at its configured time",
+    )
     parser.add_argument(
         "-l", "--lang", type=str, default=None, help="Optional: Language (ex: en)"
     )
@@ -183,7 +364,9 @@ def setupAccounts() -> dict:
     return loadedAccounts
 
 
-def executeBot(currentAccount, notifier: Notifier, args: argparse.Namespace):
+def executeBot(
+    currentAccount, notifier: Notifier, args: argparse.Namespace, desktopBrowser: Browser = None
+):
     global config
     # 获取当前的邮箱账号
     current_email = currentAccount.get("username", "")
@@ -191,99 +374,207 @@ def executeBot(currentAccount, notifier: Notifier, args: argparse.Namespace):
     logging.info(
         f'********************{current_email}********************'
     )
-    with Browser(mobile=False, account=currentAccount, args=args) as desktopBrowser:
-        accountPointsCounter = Login(desktopBrowser).login()
-        logging.info(f"{LOG_TAG} Login(desktopBrowser).login() done")
-        startingPoints = accountPointsCounter
-        logging.info(
-            f"[POINTS][main.py] You have {desktopBrowser.utils.formatNumber(accountPointsCounter)} points on your account !"
-        )
-        
-        # 执行App端任务 - 修改这部分代码
-        if config.get("enable_app_tasks", True):
+    # 断点日志，记录今天已完成的阶段，程序中断后重新运行时跳过这些阶段
+    journal = CheckpointJournal(
+        current_email, enabled=config.get("enable_checkpoint", True)
+    )
+    if journal.isStageDone("finished"):
+        logging.info(f"{LOG_TAG} {current_email} 今天的任务已全部完成，跳过")
+        journal.close()
+        if desktopBrowser is not None:
+            desktopBrowser.closeBrowser()
+        return journal.getStageResult("finished")
+
+    # 常驻模式下会传入预先启动并登录好的浏览器
+    if desktopBrowser is None:
+        desktopBrowser = Browser(mobile=False, account=currentAccount, args=args)
+    with journal, desktopBrowser:
+        # 使用阶段依赖图代替固定的执行顺序，互不冲突的阶段（例如App阅读和桌面端每日活动）默认同时执行，
+        # max_parallel_stages设置为1时所有阶段依次执行
+        # 开启use_multithreading时桌面端和移动端搜索同时执行，否则移动端搜索在桌面端搜索之后执行
+        use_multithreading = config.get("use_multithreading", False)
+        max_parallel_stages = config.get("max_parallel_stages", 2)
+        logging.info(f"[CMY][EXECUTION MODE] max_parallel_stages: {max_parallel_stages}")
+        graph = StageGraph(max_parallel_stages, journal)
+        # 移动端搜索是否复用桌面端浏览器（切换为移动端身份），复用时与桌面端阶段不能同时执行
+        reuse_desktop_for_mobile = config.get("reuse_desktop_for_mobile", False)
+        # 在桌面端浏览器中交替执行桌面端和移动端搜索，一种搜索暂停期间执行另一种搜索
+        interleave_searches = config.get("interleave_searches", False)
+        # 通过HTTP请求执行搜索，不在浏览器中打开搜索页面
+        http_search = config.get("search_backend", BACKEND_BROWSER) == BACKEND_HTTP
+        app_tasks = AppTasks(desktopBrowser)
+        # 创建线程锁
+        lock = threading.Lock()
+        accountPointsCounter = 0
+
+        def blocking(profile, func):
+            # 阶段执行期间在桌面端浏览器中使用对应的请求拦截配置
+            def run():
+                with desktopBrowser.blockingPolicy.use(profile):
+                    return func()
+            return run
+
+        def login():
+            nonlocal accountPointsCounter
+            # 登录期间在后台获取热门搜索词，搜索时不需要等待网络请求
+            getTermProvider(config.get("hot_search_cache_ttl", 3600)).prefetch()
+            if desktopBrowser.loginPoints is not None:
+                accountPointsCounter = desktopBrowser.loginPoints
+                logging.info(f"{LOG_TAG} 浏览器已预先登录，跳过登录")
+            else:
+                accountPointsCounter = Login(desktopBrowser).login()
+                logging.info(f"{LOG_TAG} Login(desktopBrowser).login() done")
+            # 从断点恢复时使用第一次运行时记录的起始积分，保证统计的本次获得积分准确
+            journal.set("startingPoints", journal.get("startingPoints", accountPointsCounter))
+            logging.info(
+                f"[POINTS][main.py] You have {desktopBrowser.utils.formatNumber(accountPointsCounter)} points on your account !"
+            )
+            return accountPointsCounter
+
+        def app_auth():
+            # App端任务只有获取OAuth token时需要浏览器，之后都是纯HTTP请求
+            return app_tasks.get_access_token()
+
+        def run_app_tasks():
+            if not app_tasks.access_token:
+                logging.error(f"{LOG_TAG} {current_email} 获取认证失败，跳过App端任务")
+                return {"app_sign_in": -1, "app_read_articles": -1}
             try:
-                app_tasks = AppTasks(desktopBrowser)
-                app_results = app_tasks.run_all_tasks(startingPoints)
+                app_results = app_tasks.run_all_tasks()
                 logging.info(f"{LOG_TAG} {current_email} App端任务执行结果: {app_results}")
+                return app_results
             except Exception as e:
                 logging.error(f"{LOG_TAG} {current_email} App端任务执行异常: {str(e)}")
-        else:
-            logging.info(f"{LOG_TAG} {current_email} App端任务已禁用")
+                raise
 
-        DailySet(desktopBrowser).completeDailySet()
-        PunchCards(desktopBrowser).completePunchCards()
-        MorePromotions(desktopBrowser).completeMorePromotions()
-        (
-            remainingSearches,
-            remainingSearchesM,
-        ) = desktopBrowser.utils.getRemainingSearches()
-
-        # 创建线程锁
-        lock = threading.Lock()
+        def remaining_searches():
+            if journal.isStageDone("interleaved_search") or (
+                journal.isStageDone("desktop_search") and journal.isStageDone("mobile_search")
+            ):
+                return 0, 0
+            return desktopBrowser.utils.getRemainingSearches()
 
         def desktop_search():
             nonlocal accountPointsCounter
-            try:
-                logging.info("[BING] DESKTOP_SEARCH thread started")
-                if remainingSearches != 0:
-                    points = Searches(desktopBrowser).bingSearches(
+            remainingSearches = graph.results["remaining_searches"][0]
+            logging.info("[BING] DESKTOP_SEARCH thread started")
+            if remainingSearches != 0:
+                points = Searches(desktopBrowser).bingSearches(
+                    current_email,
+                    remainingSearches
+                )
+                logging.info("[BING] DESKTOP_SEARCH finished")
+
+                with lock:
+                    accountPointsCounter = max(accountPointsCounter, points)
+            else:
+                logging.info("[BING] DESKTOP_SEARCH no searches remaining")
+
+        def mobile_search():
+            nonlocal accountPointsCounter
+            remainingSearchesM = graph.results["remaining_searches"][1]
+            logging.info("[BING] MOBILE_SEARCH thread started")
+            if remainingSearchesM != 0 and http_search:
+                # 通过HTTP搜索时只需要移动端的User-Agent，不切换浏览器身份，也不启动移动端浏览器
+                mobile_points = Searches(desktopBrowser, mobile=True).bingSearches(
+                    current_email,
+                    remainingSearchesM
+                )
+                logging.info("[BING] MOBILE_SEARCH finished")
+                with lock:
+                    accountPointsCounter = max(accountPointsCounter, mobile_points)
+            elif remainingSearchesM != 0 and reuse_desktop_for_mobile:
+                # 在已登录的桌面端浏览器中切换为移动端身份，不再启动第二个浏览器并重新登录
+                with desktopBrowser.identity(mobile=True), desktopBrowser.blockingPolicy.use(PROFILE_SEARCH):
+                    mobile_points = Searches(desktopBrowser).bingSearches(
                         current_email,
-                        remainingSearches
+                        remainingSearchesM
                     )
-                    logging.info("[BING] DESKTOP_SEARCH finished")
-
+                    logging.info("[BING] MOBILE_SEARCH finished")
                     with lock:
-                        accountPointsCounter = max(accountPointsCounter, points)
-                else:
-                    logging.info("[BING] DESKTOP_SEARCH no searches remaining")
-            except Exception as e:
-                logging.error(f"Desktop search failed: {e}")
+                        accountPointsCounter = max(accountPointsCounter, mobile_points)
+            elif remainingSearchesM != 0:
+                with Browser(
+                    mobile=True, account=currentAccount, args=args
+                ) as mobileBrowser:
+                    Login(mobileBrowser).login()
+                    mobileBrowser.blockingPolicy.apply(PROFILE_SEARCH)
+                    mobile_points = Searches(mobileBrowser).bingSearches(
+                        current_email,
+                        remainingSearchesM
+                    )
+                    logging.info("[BING] MOBILE_SEARCH finished")
+                    with lock:
+                        accountPointsCounter = max(accountPointsCounter, mobile_points)
+            else:
+                logging.info("[BING] MOBILE_SEARCH no searches remaining")
 
-        def mobile_search():
+        def interleaved_search():
             nonlocal accountPointsCounter
-            try:
-                logging.info("[BING] MOBILE_SEARCH thread started")
-                if remainingSearchesM != 0:
-                    with Browser(
-                        mobile=True, account=currentAccount, args=args
-                    ) as mobileBrowser:
-                        Login(mobileBrowser).login()
-                        mobile_points = Searches(mobileBrowser).bingSearches(
-                            current_email,
-                            remainingSearchesM
-                        )
-                        logging.info("[BING] MOBILE_SEARCH finished")
-                        with lock:
-                            accountPointsCounter = max(accountPointsCounter, mobile_points)
-                else:
-                    logging.info("[BING] MOBILE_SEARCH no searches remaining")
-            except Exception as e:
-                logging.error(f"Mobile search failed: {e}")
-
-        # 从配置中获取是否使用多线程的标志
-        use_multithreading = config.get("use_multithreading", False)
-        logging.info(f"[CMY][EXECUTION MODE] use_multithreading: {use_multithreading}")
-        
-        if use_multithreading:
-            logging.info("[EXECUTION MODE] 使用多线程模式执行搜索任务")
-            # 创建线程
-            desktop_thread = threading.Thread(target=desktop_search)
-            mobile_thread = threading.Thread(target=mobile_search)
-
-            # 启动线程
-            desktop_thread.start()
-            mobile_thread.start()
-
-            # 等待线程完成
-            desktop_thread.join()
-            mobile_thread.join()
+            remainingSearches, remainingSearchesM = graph.results["remaining_searches"]
+            if remainingSearches == 0 and remainingSearchesM == 0:
+                logging.info("[BING] INTERLEAVED_SEARCH no searches remaining")
+                return
+            points = InterleavedSearches(desktopBrowser).run(
+                current_email, remainingSearches, remainingSearchesM
+            )
+            with lock:
+                accountPointsCounter = max(accountPointsCounter, points)
+
+        def read_finish_points():
+            # 获取最新的积分，App端任务和单独的移动端浏览器获得的积分不会使缓存失效，强制重新读取
+            desktopBrowser.utils.invalidateDashboard()
+            return desktopBrowser.utils.getAccountPoints()
+
+        graph.addStage("login", login, resources=[DESKTOP_BROWSER], checkpoint=False)
+        if config.get("enable_app_tasks", True):
+            if not journal.isStageDone("app_tasks"):
+                graph.addStage("app_auth", app_auth, ["login"], [DESKTOP_BROWSER], checkpoint=False)
+                graph.addStage("app_tasks", run_app_tasks, ["app_auth"], [HTTP_ONLY], optional=True)
+            else:
+                graph.addStage("app_tasks", run_app_tasks, ["login"], [HTTP_ONLY], optional=True)
         else:
-            logging.info("[EXECUTION MODE] 使用单线程模式执行搜索任务")
-            # 单线程依次执行
-            desktop_search()
-            mobile_search()
-            # 获取最新的积分
-        finish_points = desktopBrowser.utils.getAccountPoints()
+            logging.info(f"{LOG_TAG} {current_email} App端任务已禁用")
+        graph.addStage(
+            "daily_set", blocking(PROFILE_QUIZ, lambda: DailySet(desktopBrowser, journal).completeDailySet()),
+            ["login"], [DESKTOP_BROWSER],
+        )
+        graph.addStage(
+            "punch_cards", blocking(PROFILE_QUIZ, lambda: PunchCards(desktopBrowser, journal).completePunchCards()),
+            ["login"], [DESKTOP_BROWSER],
+        )
+        graph.addStage(
+            "more_promotions",
+            blocking(PROFILE_QUIZ, lambda: MorePromotions(desktopBrowser, journal).completeMorePromotions()),
+            ["login"], [DESKTOP_BROWSER],
+        )
+        graph.addStage(
+            "remaining_searches", blocking(PROFILE_DASHBOARD, remaining_searches),
+            ["daily_set", "punch_cards", "more_promotions"], [DESKTOP_BROWSER], checkpoint=False,
+        )
+        # 搜索失败时只记录日志，不影响最终积分统计
+        if interleave_searches:
+            graph.addStage(
+                "interleaved_search", blocking(PROFILE_SEARCH, interleaved_search),
+                ["remaining_searches"], [DESKTOP_BROWSER], optional=True,
+            )
+        else:
+            graph.addStage(
+                "desktop_search", blocking(PROFILE_SEARCH, desktop_search), ["remaining_searches"], [DESKTOP_BROWSER], optional=True
+            )
+            graph.addStage(
+                "mobile_search", mobile_search,
+                ["remaining_searches"] + ([] if use_multithreading else ["desktop_search"]),
+                [DESKTOP_BROWSER if reuse_desktop_for_mobile or http_search else MOBILE_BROWSER], optional=True,
+            )
+        graph.addStage(
+            "finish_points", blocking(PROFILE_DASHBOARD, read_finish_points),
+            [name for name in graph.stages], [DESKTOP_BROWSER], checkpoint=False,
+        )
+        results = graph.run()
+        startingPoints = journal.get("startingPoints")
+        app_results = results.get("app_tasks") or {"app_sign_in": 0, "app_read_articles": 0}
+        finish_points = results["finish_points"]
         logging.info(
             f"[POINTS][main.py] You have {finish_points} points on your account ~~finish_points!"
         )
@@ -314,7 +605,10 @@ def executeBot(currentAccount, notifier: Notifier, args: argparse.Namespace):
         # notifier.wechat(f"{current_email}异常，积分不足150", f"注意：今日获得积分不足150，可能存在异常情况！，清查看log日志")
 
     # 返回当前账号的执行结果
-    return f"{message_title}，本次获得积分：{earnedPoints}，app签到积分：{app_results['app_sign_in']}，app阅读积分：{app_results['app_read_articles']}，总积分：{havePoints} "
+    account_result = f"{message_title}，本次获得积分：{earnedPoints}，app签到积分：{app_results['app_sign_in']}，app阅读积分：{app_results['app_read_articles']}，总积分：{havePoints} "
+    journal.markStageDone("finished", account_result)
+    journal.close()
+    return account_result
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,10 +3,12 @@ import logging
 import time
 import json
 import random
-import requests
 import re  # 添加正则表达式模块导入
 from typing import Optional, Dict, Any
 
+from src import httpClient, tracing
+from src.scheduler import idleWait
+
 LOG_TAG = "[CMY][APP]"
 
 class AppTasks:
@@ -29,8 +31,7 @@ class AppTasks:
         """
         从浏览器中获取Cookie，用于API请求
         """
-        cookie_jar = self.webdriver.get_cookies()
-        return {cookie["name"]: cookie["value"] for cookie in cookie_jar}
+        return self.utils.cookieBridge.cookiesFor("prod.rewardsplatform.microsoft.com")
     
     def get_access_token(self) -> bool:
         """
@@ -43,7 +44,7 @@ class AppTasks:
             
             # 使用浏览器会话发起请求获取授权码
             self.webdriver.get(auth_code_url)
-            time.sleep(2)  # 等待页面加载
+            tracing.sleep(2)  # 等待页面加载
             
             # 获取最终URL来提取授权码
             final_url = self.webdriver.current_url
@@ -70,7 +71,7 @@ class AppTasks:
                 "grant_type": "authorization_code"
             }
             
-            response = requests.post(self.oauth_token_url, headers=headers, data=data, timeout=30)
+            response = httpClient.post(self.oauth_token_url, headers=headers, data=data, timeout=30)
             
             if response.status_code == 200:
                 token_data = response.json()
@@ -89,15 +90,18 @@ class AppTasks:
         
         return False
     
-    def app_sign_in(self, startingPoints: int) -> int:
+    def app_sign_in(self) -> int:
         """
         执行App端每日签到任务
+
+        App端任务与桌面端活动同时执行，签到获得的积分按签到请求前后的积分差计算，
+        不使用账号开始执行时的积分，避免把同时执行的其他活动获得的积分算进来。
         """
         logging.info(f"{LOG_TAG} {self.username} 开始执行App端签到任务")
         
         try:
             # 添加随机延时，模拟人类操作
-            time.sleep(random.uniform(10, 15))
+            idleWait(random.uniform(10, 15))
             
             # 获取access token
             if not self.access_token and not self.get_access_token():
@@ -135,10 +139,13 @@ class AppTasks:
             }
             
             # 添加随机延时
-            time.sleep(random.uniform(10, 15))
+            idleWait(random.uniform(10, 15))
+            
+            # 紧接着签到请求读取积分，作为计算签到积分的基准
+            points_before = self.get_balance()
             
             # 发送签到请求
-            response = requests.post(
+            response = httpClient.post(
                 self.api_url,
                 json=payload,
                 headers=headers,
@@ -152,15 +159,21 @@ class AppTasks:
                 # 提取新的积分值
                 new_points = result["response"]["balance"]
                 
+                if points_before is not None:
+                    earned = new_points - points_before
+                else:
+                    # 读取签到前的积分失败时，使用签到记录中的积分
+                    earned = (result["response"].get("activity") or {}).get("p", 0)
+                
                 # 检查是否成功签到
-                if new_points > startingPoints:
-                    logging.info(f"{LOG_TAG} {self.username} App端签到成功，获得 {new_points - startingPoints} 积分")
+                if earned > 0:
+                    logging.info(f"{LOG_TAG} {self.username} App端签到成功，获得 {earned} 积分")
                 else:
                     logging.warning(f"{LOG_TAG} {self.username} App端签到可能已完成或失败")
                 
                 # 增加延时让积分有时间更新
-                time.sleep(random.uniform(5, 10))
-                return new_points - startingPoints
+                idleWait(random.uniform(5, 10))
+                return earned
             else:
                 logging.error(f"{LOG_TAG} {self.username} App端签到HTTP请求失败: {response.status_code}")
                 logging.error(f"{LOG_TAG} {self.username} 响应内容: {response.text}")
@@ -169,6 +182,16 @@ class AppTasks:
         
         return -1
     
+    def get_balance(self) -> Optional[int]:
+        """
+        通过App端接口读取当前积分，失败时返回None
+        """
+        progress = self.get_read_progress()
+        try:
+            return progress["response"]["balance"]
+        except (TypeError, KeyError):
+            return None
+    
     def get_read_progress(self) -> Optional[Dict[str, Any]]:
         """
         获取阅读任务进度
@@ -186,9 +209,9 @@ class AppTasks:
             }
             
             # 添加随机延时
-            time.sleep(random.uniform(2, 4))
+            idleWait(random.uniform(2, 4))
             
-            response = requests.get(
+            response = httpClient.get(
                 self.read_progress_url,
                 headers=headers,
                 timeout=30
@@ -212,7 +235,7 @@ class AppTasks:
         
         try:
             # 添加随机延时
-            time.sleep(random.uniform(3, 7))
+            idleWait(random.uniform(3, 7))
             
             # 确保有access token
             if not self.access_token and not self.get_access_token():
@@ -259,7 +282,7 @@ class AppTasks:
             
             for i in range(articles_to_read):
                 # 添加较长的随机延时，模拟真实阅读时间
-                time.sleep(random.uniform(8, 15))
+                idleWait(random.uniform(8, 15))
                 
                 # 构造符合temp.js格式的请求数据
                 payload = {
@@ -272,7 +295,7 @@ class AppTasks:
                     }
                 }
                 
-                response = requests.post(
+                response = httpClient.post(
                     self.api_url,
                     json=payload,
                     headers=headers,
@@ -290,10 +313,10 @@ class AppTasks:
                     logging.error(f"{LOG_TAG} {self.username} 响应内容: {response.text}")
                     
                 # 文章间隔，使用更长的随机延时
-                time.sleep(random.uniform(5, 10))
+                idleWait(random.uniform(5, 10))
             
             # 增加较长延时让积分有时间更新
-            time.sleep(random.uniform(10, 15))
+            idleWait(random.uniform(10, 15))
             
             # 重新获取阅读进度，确认积分更新
             updated_progress = self.get_read_progress()
@@ -308,12 +331,12 @@ class AppTasks:
         
         return -1
     
-    def run_all_tasks(self, startingPoints: int) -> Dict[str, int]:
+    def run_all_tasks(self) -> Dict[str, int]:
         """
         运行所有App端任务
         """
         results = {
-            "app_sign_in": self.app_sign_in(startingPoints),
+            "app_sign_in": self.app_sign_in(),
             "app_read_articles": self.app_read_articles()
         }
         return results
\ No newline at end of file
@@ -0,0 +1,205 @@
+import contextlib
+import logging
+import threading
+from fnmatch import fnmatchcase
+from typing import Optional
+from urllib.parse import urlparse
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+LOG_TAG = "[CMY][BLOCK]"
+
+# 阶段对应的拦截配置
+PROFILE_NONE = "none"
+PROFILE_SEARCH = "search"
+PROFILE_DASHBOARD = "dashboard"
+PROFILE_QUIZ = "quiz"
+
+# 广告和遥测脚本，所有拦截配置都会拦截
+TELEMETRY_URL_PATTERNS = [
+    "*://*.clarity.ms/*",
+    "*://bat.bing.com/*",
+    "*://*.doubleclick.net/*",
+    "*://browser.events.data.microsoft.com/*",
+    "*://*.events.data.microsoft.com/*",
+    "*://c.bing.com/c.gif*",
+    "*://c.msn.com/*",
+    "*://*.adnxs.com/*",
+]
+# 大体积的静态资源
+HEAVY_URL_PATTERNS = [
+    "*.png*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.gif*",
+    "*.webp*",
+    "*.svg*",
+    "*.ico*",
+    "*.woff*",
+    "*.woff2*",
+    "*.ttf*",
+    "*.mp4*",
+    "*.webm*",
+    "*.m3u8*",
+    "*/th?id=*",
+]
+# 视频和字体，答题页面的图片是选项的一部分，不能拦截
+MEDIA_URL_PATTERNS = [
+    "*.woff*",
+    "*.woff2*",
+    "*.ttf*",
+    "*.mp4*",
+    "*.webm*",
+    "*.m3u8*",
+]
+
+# 每种拦截配置拦截的URL模式（Network.setBlockedURLs的通配符格式）和资源类型（Sec-Fetch-Dest）
+DEFAULT_PROFILES = {
+    PROFILE_NONE: {"urls": [], "types": []},
+    PROFILE_SEARCH: {
+        "urls": TELEMETRY_URL_PATTERNS + HEAVY_URL_PATTERNS,
+        "types": ["image", "font", "video", "audio", "track"],
+    },
+    PROFILE_DASHBOARD: {
+        "urls": TELEMETRY_URL_PATTERNS + HEAVY_URL_PATTERNS,
+        "types": ["image", "font", "video", "audio", "track"],
+    },
+    PROFILE_QUIZ: {
+        "urls": TELEMETRY_URL_PATTERNS + MEDIA_URL_PATTERNS,
+        "types": ["font", "video", "audio", "track"],
+    },
+}
+
+# 被拦截资源的平均大小（字节），用于估算节省的流量
+ESTIMATED_SIZES = {
+    "image": 25 * 1024,
+    "font": 40 * 1024,
+    "video": 512 * 1024,
+    "audio": 128 * 1024,
+    "track": 4 * 1024,
+    "script": 60 * 1024,
+    "other": 10 * 1024,
+}
+# 请求头中没有Sec-Fetch-Dest时根据扩展名推断资源类型
+EXTENSION_TYPES = {
+    ".png": "image",
+    ".jpg": "image",
+    ".jpeg": "image",
+    ".gif": "image",
+    ".webp": "image",
+    ".svg": "image",
+    ".ico": "image",
+    ".woff": "font",
+    ".woff2": "font",
+    ".ttf": "font",
+    ".mp4": "video",
+    ".webm": "video",
+    ".m3u8": "video",
+}
+
+
+def resourceType(url: str, headers) -> str:
+    dest = headers.get("Sec-Fetch-Dest") if headers is not None else None
+    if dest:
+        return dest
+    path = urlparse(url).path.lower()
+    for extension, kind in EXTENSION_TYPES.items():
+        if path.endswith(extension):
+            return kind
+    return "other"
+
+
+class BlockingPolicy:
+    """
+    按阶段拦截不需要的请求，减少页面加载的流量和时间。
+
+    URL模式通过CDP的Network.setBlockedURLs在浏览器内拦截，请求不会发出；
+    资源类型通过seleniumwire的request_interceptor根据Sec-Fetch-Dest请求头拦截，
+    并按资源类型的平均大小估算节省的流量。
+    """
+
+    def __init__(self, enabled: bool = False, profiles: Optional[dict] = None):
+        self.enabled = enabled
+        self.profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+        # config.json中的blocking_profiles可以覆盖或新增拦截配置
+        for name, profile in (profiles or {}).items():
+            self.profiles[name] = {
+                "urls": list(profile.get("urls", [])),
+                "types": list(profile.get("types", [])),
+            }
+        self.current = PROFILE_NONE
+        self.driver: Optional[WebDriver] = None
+        self._lock = threading.Lock()
+        self.blockedCount = 0
+        self.blockedBytes = 0
+        # 每种资源类型被拦截的请求数
+        self.blockedByType: dict[str, int] = {}
+
+    def install(self, driver: WebDriver):
+        """在浏览器启动后调用，开启Network域并注册请求拦截器。"""
+        if not self.enabled:
+            return
+        self.driver = driver
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"{LOG_TAG} 开启Network域失败，请求拦截不可用: {e}")
+            self.enabled = False
+            return
+        driver.request_interceptor = self.intercept
+        self.apply(self.current)
+
+    def apply(self, profile: str):
+        if profile not in self.profiles:
+            logging.warning(f"{LOG_TAG} 未知的拦截配置 {profile}，不拦截请求")
+            profile = PROFILE_NONE
+        self.current = profile
+        if not self.enabled or self.driver is None:
+            return
+        try:
+            self.driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": self.profiles[profile]["urls"]}
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"{LOG_TAG} 设置拦截配置 {profile} 失败: {e}")
+
+    @contextlib.contextmanager
+    def use(self, profile: str):
+        """在with块内使用指定的拦截配置，退出时恢复原来的配置。"""
+        previous = self.current
+        self.apply(profile)
+        try:
+            yield self
+        finally:
+            self.apply(previous)
+
+    def intercept(self, request):
+        """seleniumwire的request_interceptor，在代理线程中调用。"""
+        blockedTypes = self.profiles[self.current]["types"]
+        if not blockedTypes:
+            return
+        kind = resourceType(request.url, request.headers)
+        if kind not in blockedTypes and not any(
+            fnmatchcase(request.url, pattern) for pattern in self.profiles[self.current]["urls"]
+        ):
+            return
+        request.abort()
+        with self._lock:
+            self.blockedCount += 1
+            self.blockedBytes += ESTIMATED_SIZES.get(kind, ESTIMATED_SIZES["other"])
+            self.blockedByType[kind] = self.blockedByType.get(kind, 0) + 1
+
+    def report(self) -> dict:
+        with self._lock:
+            stats = {
+                "blocked": self.blockedCount,
+                "estimatedBytesSaved": self.blockedBytes,
+                "byType": dict(self.blockedByType),
+            }
+        if self.enabled:
+            logging.info(
+                f"{LOG_TAG} 共拦截 {stats['blocked']} 个请求，"
+                f"预计节省 {stats['estimatedBytesSaved'] / 1024 / 1024:.2f} MB 流量，"
+                f"按类型: {stats['byType']}"
+            )
+        return stats
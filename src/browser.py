@@ -12,6 +12,8 @@ import ipapi
 import seleniumwire.undetected_chromedriver as webdriver
 from selenium.webdriver.chrome.webdriver import WebDriver
 
+from src.blockingPolicy import BlockingPolicy
+from src.profiles import ProfileManager
 from src.userAgentGenerator import GenerateUserAgent
 from src.utils import Utils
 
@@ -32,23 +34,26 @@ class Browser:
             self.proxy = args.proxy
         elif account.get("proxy"):
             self.proxy = account["proxy"]
-        self.userDataDir = self.setupProfiles()
-        self.browserConfig = Utils.getBrowserConfig(self.userDataDir)
-        (
-            self.userAgent,
-            self.userAgentMetadata,
-            newBrowserConfig,
-        ) = GenerateUserAgent().userAgent(self.browserConfig, mobile)
-        logging.info(f"{LOG_TAG} GenerateUserAgent().userAgent done")
-        if newBrowserConfig:
-            self.browserConfig = newBrowserConfig
-            Utils.saveBrowserConfig(self.userDataDir, self.browserConfig)
         # 读取配置文件
         config_path = Path(__file__).parent.parent / "config.json"
         with open(config_path, 'r', encoding='utf-8') as f:
             self.config = json.load(f)
+        # 开启persistent_profiles时保留Chrome配置文件夹，登录状态和HTTP缓存在多次运行之间保持
+        self.persistentProfile = self.config.get("persistent_profiles", False)
+        self.profileManager = None
+        self.userDataDir = self.setupProfiles()
+        # 每种身份（桌面端/移动端）的设备配置和User-Agent，用于在同一个浏览器中切换身份
+        self.identities: dict[str, dict] = {}
+        self.setIdentity(self.createIdentity(mobile, self.userDataDir))
+        # 按阶段拦截图片、字体、视频和遥测脚本等请求，默认关闭
+        self.blockingPolicy = BlockingPolicy(
+            self.config.get("enable_request_blocking", False),
+            self.config.get("blocking_profiles"),
+        )
         self.webdriver = self.browserSetup()
-        self.utils = Utils(self.webdriver)
+        self.utils = Utils(self.webdriver, lambda: self.userAgent)
+        # 登录成功后记录的积分，常驻模式下预先登录的浏览器据此跳过登录
+        self.loginPoints = None
 
     def __enter__(self) -> "Browser":
         return self
@@ -72,6 +77,103 @@ class Browser:
                 logging.error(f"{LOG_TAG} Unexpected error closing browser: {general_e}")
             finally:
                 self.webdriver = None
+                self.blockingPolicy.report()
+                self.utils.reportMetrics()
+        self.releaseProfile()
+
+    def acquireProfile(self) -> bool:
+        """
+        获取持久化配置文件夹的使用权，配置文件夹正在被其他进程使用时返回False，
+        此时使用全新的临时配置文件夹启动浏览器。
+        """
+        if not self.persistentProfile:
+            return False
+        self.profileManager = ProfileManager(self.userDataDir)
+        if self.profileManager.acquire():
+            return True
+        self.profileManager = None
+        return False
+
+    def releaseProfile(self):
+        if self.profileManager is not None:
+            self.profileManager.release()
+            self.profileManager = None
+
+    def launchChrome(self, options, seleniumwireOptions: dict, useProfile: bool) -> WebDriver:
+        extraOptions = {}
+        if useProfile:
+            extraOptions["user_data_dir"] = self.userDataDir.as_posix()
+        return webdriver.Chrome(
+            options=options,
+            seleniumwire_options=seleniumwireOptions,
+            # 从配置文件中获取路径
+            driver_executable_path=self.config["driver_executable_path"],
+            browser_executable_path=self.config["browser_executable_path"],
+            **extraOptions,
+        )
+
+    def createIdentity(self, mobile: bool, configDir: Path) -> dict:
+        """
+        生成一种身份的User-Agent和设备配置，配置保存在configDir下的config.json中。
+        """
+        browserConfig = Utils.getBrowserConfig(configDir)
+        (
+            userAgent,
+            userAgentMetadata,
+            newBrowserConfig,
+        ) = GenerateUserAgent().userAgent(browserConfig, mobile)
+        logging.info(f"{LOG_TAG} GenerateUserAgent().userAgent done")
+        if newBrowserConfig:
+            browserConfig = newBrowserConfig
+            Utils.saveBrowserConfig(configDir, browserConfig)
+        return {
+            "mobile": mobile,
+            "configDir": configDir,
+            "browserConfig": browserConfig,
+            "userAgent": userAgent,
+            "userAgentMetadata": userAgentMetadata,
+        }
+
+    def setIdentity(self, identity: dict):
+        self.mobile = identity["mobile"]
+        self.browserType = "mobile" if self.mobile else "desktop"
+        self.configDir = identity["configDir"]
+        self.browserConfig = identity["browserConfig"]
+        self.userAgent = identity["userAgent"]
+        self.userAgentMetadata = identity["userAgentMetadata"]
+        self.identities[self.browserType] = identity
+
+    def getIdentity(self, mobile: bool) -> dict:
+        """返回一种身份的设备配置和User-Agent，不切换浏览器当前的身份。"""
+        browserType = "mobile" if mobile else "desktop"
+        identity = self.identities.get(browserType)
+        if identity is None:
+            identity = self.createIdentity(mobile, self.setupProfiles(browserType))
+            self.identities[browserType] = identity
+        return identity
+
+    def switchIdentity(self, mobile: bool):
+        """
+        在当前浏览器会话中切换桌面端/移动端身份，重新设置设备尺寸、触摸和User-Agent，
+        登录状态保持不变，不需要再启动一个浏览器并重新登录。
+        """
+        browserType = "mobile" if mobile else "desktop"
+        if browserType == self.browserType:
+            return
+        self.setIdentity(self.getIdentity(mobile))
+        self.applyEmulation(self.webdriver)
+        logging.info(f"{LOG_TAG} 浏览器已切换为{browserType}身份")
+
+    @contextlib.contextmanager
+    def identity(self, mobile: bool):
+        """在with块内临时切换身份，退出时切换回原来的身份。"""
+        previous = self.mobile
+        self.switchIdentity(mobile)
+        try:
+            yield self
+        finally:
+            if self.isSessionValid():
+                self.switchIdentity(previous)
 
     def browserSetup(self) -> WebDriver:
         options = webdriver.ChromeOptions()
@@ -94,18 +196,21 @@ class Browser:
                 "no_proxy": "localhost,127.0.0.1",
             }
 
+        # 未开启persistent_profiles时不使用user_data_dir，之前总是会遇到session有关的报错，
+        # 开启后由ProfileManager清理残留的锁文件，启动失败时隔离配置文件夹并使用全新的配置文件夹重试
+        useProfile = self.acquireProfile()
         try:
-            driver = webdriver.Chrome(
-                options=options,
-                seleniumwire_options=seleniumwireOptions,
-                # 注释user_data_dir原因，这里大概是跟读取session文件夹有关，因为总是会遇到关于session有关的报错，因此注释
-                # user_data_dir=self.userDataDir.as_posix(),
-                # 从配置文件中获取路径
-                driver_executable_path=self.config["driver_executable_path"],
-                browser_executable_path=self.config["browser_executable_path"],
-            )
+            try:
+                driver = self.launchChrome(options, seleniumwireOptions, useProfile)
+            except SessionNotCreatedException as e:
+                if not useProfile:
+                    raise
+                logging.warning(f"{LOG_TAG} 使用持久化配置文件夹启动失败，隔离后重试: {e}")
+                self.profileManager.quarantine()
+                driver = self.launchChrome(options, seleniumwireOptions, useProfile)
             logging.info(f"{LOG_TAG} webdriver.Chrome done")
         except SessionNotCreatedException as e:
+            self.releaseProfile()
             logging.info(f"{LOG_TAG} 尝试删除sessions文件夹来解决问题，记得在任务管理器中把关于chrome的进程都关掉才能删除成功")
             logging.error(f"{LOG_TAG} Session creation failed: {e}")
             # 重新抛出异常，让上层代码处理
@@ -114,6 +219,12 @@ class Browser:
         seleniumLogger = logging.getLogger("seleniumwire")
         seleniumLogger.setLevel(logging.ERROR)
 
+        self.applyEmulation(driver)
+        self.blockingPolicy.install(driver)
+        return driver
+
+    def applyEmulation(self, driver: WebDriver):
+        """根据当前身份设置设备尺寸、触摸模拟和User-Agent。"""
         if self.browserConfig.get("sizes"):
             deviceHeight = self.browserConfig["sizes"]["height"]
             deviceWidth = self.browserConfig["sizes"]["width"]
@@ -128,7 +239,7 @@ class Browser:
                 "height": deviceHeight,
                 "width": deviceWidth,
             }
-            Utils.saveBrowserConfig(self.userDataDir, self.browserConfig)
+            Utils.saveBrowserConfig(self.configDir, self.browserConfig)
 
         if self.mobile:
             screenHeight = deviceHeight + 146
@@ -140,11 +251,12 @@ class Browser:
         logging.info(f"Screen size: {screenWidth}x{screenHeight}")
         logging.info(f"Device size: {deviceWidth}x{deviceHeight}")
 
-        if self.mobile:
+        if self.mobile or "mobile" in self.identities:
+            # 切换回桌面端时需要关闭触摸模拟
             driver.execute_cdp_cmd(
                 "Emulation.setTouchEmulationEnabled",
                 {
-                    "enabled": True,
+                    "enabled": self.mobile,
                 },
             )
 
@@ -178,13 +290,14 @@ class Browser:
             },
         )
 
-        return driver
-
-    def setupProfiles(self) -> Path:
+    def setupProfiles(self, browserType: str = None) -> Path:
         """
         Sets up the sessions profile for the chrome browser.
         Uses the username to create a unique profile for the session.
 
+        Args:
+            browserType: "desktop" or "mobile", defaults to the browser's own type.
+
         Returns:
             Path
         """
@@ -193,10 +306,10 @@ class Browser:
         sessionsDir = parent / "sessions"
 
         sessionUuid = uuid.uuid5(uuid.NAMESPACE_DNS, self.username)
-        sessionsDir = sessionsDir / str(sessionUuid) / self.browserType
+        sessionsDir = sessionsDir / str(sessionUuid) / (browserType or self.browserType)
         
-        # 添加会话文件夹清理逻辑
-        if sessionsDir.exists():
+        # 添加会话文件夹清理逻辑，持久化配置文件夹由ProfileManager管理，不清理
+        if sessionsDir.exists() and not self.persistentProfile:
             try:
                 import shutil
                 shutil.rmtree(sessionsDir)
@@ -223,6 +336,8 @@ class Browser:
                 self.closeBrowser()
         except Exception as e:
             logging.error(f"关闭浏览器时发生错误: {e}")
+        finally:
+            self.releaseProfile()
     
     def getCCodeLang(self, lang: str, geo: str) -> tuple:
         if lang is None or geo is None:
@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+LOG_TAG = "[CMY][CHECKPOINT]"
+
+CHECKPOINTS_DIR = Path(__file__).resolve().parent.parent / "checkpoints"
+
+# 所有打开的日志，收到SIGTERM时统一落盘
+_openJournals = set()
+_openJournalsLock = threading.Lock()
+# 本进程中当天已经清理过旧日志的(账号目录, 日期)，每个账号每天只清理一次，日期变化时清空
+_prunedDays = set()
+
+
+class CheckpointJournal:
+    """
+    按账号和日期记录执行进度的断点日志。
+
+    日志保存在 checkpoints/<账号uuid>/<日期>.json 中，记录已完成的阶段和活动offerId。
+    程序崩溃或被终止后重新运行时，已完成的阶段和活动会被跳过。
+    """
+
+    def __init__(self, username: str, enabled: bool = True, day: Optional[str] = None):
+        self.username = username
+        self.enabled = enabled
+        self.day = day or date.today().isoformat()
+        accountUuid = uuid.uuid5(uuid.NAMESPACE_DNS, username)
+        self.accountDir = CHECKPOINTS_DIR / str(accountUuid)
+        self.path = self.accountDir / f"{self.day}.json"
+        self._lock = threading.RLock()
+        self._dirty = False
+        self.data = self._load()
+        if self.enabled:
+            with _openJournalsLock:
+                _openJournals.add(self)
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _load(self) -> dict:
+        emptyData = {
+            "username": self.username,
+            "date": self.day,
+            "stages": {},
+            "activities": {},
+            "values": {},
+        }
+        if not self.enabled:
+            return emptyData
+        self._pruneOldJournals()
+        if not self.path.exists():
+            return emptyData
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for key, value in emptyData.items():
+                data.setdefault(key, value)
+            logging.info(
+                f"{LOG_TAG} {self.username} 读取断点日志，已完成阶段: {list(data['stages'])}"
+            )
+            return data
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"{LOG_TAG} {self.username} 断点日志损坏，重新开始: {e}")
+            return emptyData
+
+    def _pruneOldJournals(self):
+        """只保留当天的日志文件，每个账号每天只扫描一次目录。"""
+        key = (self.accountDir, self.day)
+        with _openJournalsLock:
+            if key in _prunedDays:
+                return
+            # 常驻模式下只保留当天的记录，集合大小不超过账号数
+            _prunedDays.difference_update(
+                [prunedKey for prunedKey in _prunedDays if prunedKey[1] != self.day]
+            )
+            _prunedDays.add(key)
+        if not self.accountDir.exists():
+            return
+        for journalFile in self.accountDir.glob("*.json"):
+            if journalFile.name != self.path.name:
+                try:
+                    journalFile.unlink()
+                except OSError:
+                    pass
+
+    def isStageDone(self, stage: str) -> bool:
+        with self._lock:
+            return stage in self.data["stages"]
+
+    def getStageResult(self, stage: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.data["stages"].get(stage, {}).get("result", default)
+
+    def markStageDone(self, stage: str, result: Any = None):
+        with self._lock:
+            self.data["stages"][stage] = {"doneAt": time.time(), "result": result}
+            self._dirty = True
+            self.flush()
+
+    def isActivityDone(self, offerId: Optional[str]) -> bool:
+        if not offerId:
+            return False
+        with self._lock:
+            return offerId in self.data["activities"]
+
+    def markActivityDone(self, offerId: Optional[str]):
+        if not offerId:
+            return
+        with self._lock:
+            self.data["activities"][offerId] = time.time()
+            self._dirty = True
+            self.flush()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.data["values"].get(key, default)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self.data["values"][key] = value
+            self._dirty = True
+            self.flush()
+
+    def flush(self):
+        """原子地把日志写入磁盘，先写临时文件再替换，避免写入一半时被终止导致文件损坏。"""
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.accountDir.mkdir(parents=True, exist_ok=True)
+                tmpPath = self.path.with_suffix(f".{os.getpid()}.tmp")
+                tmpPath.write_text(
+                    json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8"
+                )
+                os.replace(tmpPath, self.path)
+                self._dirty = False
+            except OSError as e:
+                logging.error(f"{LOG_TAG} {self.username} 写入断点日志失败: {e}")
+
+    def close(self):
+        self.flush()
+        with _openJournalsLock:
+            _openJournals.discard(self)
+
+
+def flushAllJournals():
+    with _openJournalsLock:
+        journals = list(_openJournals)
+    for journal in journals:
+        journal.flush()
+
+
+def installSignalHandlers():
+    """
+    收到SIGTERM时先把所有断点日志落盘再退出，保证重新运行时可以从中断的地方继续。
+    只能在主线程中调用。
+    """
+    previousHandler = signal.getsignal(signal.SIGTERM)
+
+    def handler(signum, frame):
+        logging.warning(f"{LOG_TAG} 收到终止信号，保存断点日志后退出")
+        flushAllJournals()
+        if callable(previousHandler):
+            previousHandler(signum, frame)
+        raise SystemExit(128 + signum)
+
+    try:
+        signal.signal(signal.SIGTERM, handler)
+    except ValueError:
+        # 不在主线程中，无法注册信号处理函数
+        logging.warning(f"{LOG_TAG} 非主线程，无法注册SIGTERM处理函数")
@@ -0,0 +1,101 @@
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+
+LOG_TAG = "[CMY][COOKIE]"
+
+COOKIES_DIR = Path(__file__).resolve().parent.parent / "sessions" / "cookies"
+
+# Network.getAllCookies返回但Network.setCookies不接受的字段
+READ_ONLY_FIELDS = ("size", "session")
+SALT_SIZE = 16
+KDF_ITERATIONS = 200_000
+
+
+class CookieStore:
+    """
+    每个账号的登录Cookie快照，加密保存在 sessions/cookies/<账号uuid>.bin 中。
+
+    密钥由账号密码和随机盐通过PBKDF2派生，不在磁盘上保存密钥。
+    登录成功后保存快照，下次启动时通过CDP注入Cookie即可恢复登录状态，跳过交互式登录。
+    """
+
+    def __init__(self, username: str, password: str, maxAgeDays: float = 7):
+        self.username = username
+        self.password = password
+        self.maxAge = maxAgeDays * 86400
+        self.path = COOKIES_DIR / f"{uuid.uuid5(uuid.NAMESPACE_DNS, username)}.bin"
+
+    def _fernet(self, salt: bytes) -> Fernet:
+        key = hashlib.pbkdf2_hmac(
+            "sha256", self.password.encode("utf-8"), salt, KDF_ITERATIONS, dklen=32
+        )
+        return Fernet(base64.urlsafe_b64encode(key))
+
+    def save(self, cookies: list):
+        salt = os.urandom(SALT_SIZE)
+        payload = json.dumps({"savedAt": time.time(), "cookies": cookies}).encode("utf-8")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmpPath = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmpPath.write_bytes(salt + self._fernet(salt).encrypt(payload))
+            os.replace(tmpPath, self.path)
+            logging.info(f"{LOG_TAG} {self.username} 已保存 {len(cookies)} 个Cookie")
+        except OSError as e:
+            logging.error(f"{LOG_TAG} {self.username} 保存Cookie快照失败: {e}")
+
+    def load(self) -> Optional[list]:
+        """
+        读取Cookie快照，文件不存在、已过期或无法解密（例如密码已修改）时返回None。
+        """
+        if not self.path.exists():
+            return None
+        try:
+            data = self.path.read_bytes()
+            salt, token = data[:SALT_SIZE], data[SALT_SIZE:]
+            snapshot = json.loads(self._fernet(salt).decrypt(token))
+        except (OSError, ValueError, InvalidToken) as e:
+            logging.warning(f"{LOG_TAG} {self.username} Cookie快照无法读取，已删除: {e}")
+            self.clear()
+            return None
+        if time.time() - snapshot.get("savedAt", 0) > self.maxAge:
+            logging.info(f"{LOG_TAG} {self.username} Cookie快照已过期")
+            self.clear()
+            return None
+        return snapshot["cookies"]
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def toCookieParams(cookies: list) -> list:
+    """把Network.getAllCookies返回的Cookie转换为Network.setCookies接受的参数。"""
+    params = []
+    for cookie in cookies:
+        param = {key: value for key, value in cookie.items() if key not in READ_ONLY_FIELDS}
+        # 会话Cookie的expires为-1，设置时需要去掉
+        if cookie.get("session") or param.get("expires", -1) < 0:
+            param.pop("expires", None)
+        params.append(param)
+    return params
+
+
+def cookiesForHost(cookies: list, host: str) -> dict:
+    """筛选出会随请求发送到host的Cookie，返回name到value的字典。"""
+    result = {}
+    for cookie in cookies:
+        domain = cookie.get("domain", "").lstrip(".")
+        if host == domain or host.endswith("." + domain):
+            result[cookie["name"]] = cookie["value"]
+    return result
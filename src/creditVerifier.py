@@ -0,0 +1,105 @@
+import logging
+import queue
+import threading
+import time
+
+from src import tracing
+from src.scheduler import idling
+
+LOG_TAG = "[CMY][VERIFY]"
+
+# 提交搜索后等待积分到账的时间（秒）
+CREDIT_DELAY = 20
+# 每次检查读取积分的最大重试次数
+CHECK_TRIES = 3
+# 搜索结束后等待所有检查完成的最长时间（秒）
+DRAIN_TIMEOUT = 120
+
+
+class CreditVerifier:
+    """
+    在后台线程中检查搜索是否获得了积分。
+
+    搜索提交后调用submit登记，后台线程等待delay秒后通过HTTP读取积分，
+    结果按提交顺序放入结果队列，浏览器不等待检查结果，继续进行下一次搜索。
+    后台线程不访问webdriver，检查用的Cookie在submit时从浏览器中读取。
+    """
+
+    def __init__(self, utils, delay: float = CREDIT_DELAY):
+        self.utils = utils
+        self.delay = delay
+        self._pending: queue.Queue = queue.Queue()
+        self._results: queue.Queue = queue.Queue()
+        self._outstanding = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="credit-verifier", daemon=True)
+        self._thread.start()
+
+    def submit(self, index: int, term: str):
+        """登记第index次搜索，搜索词为term。"""
+        cookies = self.utils.bingInfoCookies()
+        with self._lock:
+            self._outstanding += 1
+        self._pending.put((index, term, time.monotonic() + self.delay, cookies))
+
+    def _check(self, cookies: dict) -> int:
+        try:
+            data = self.utils.getBingInfo(cookies=cookies, maxTries=CHECK_TRIES)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"{LOG_TAG} 读取积分失败: {e}")
+            return 0
+        return data["userInfo"]["balance"] if data else 0
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            index, term, due, cookies = item
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            with tracing.span("creditVerifier.check", "search", term=term):
+                balance = self._check(cookies)
+            self._results.put((index, term, balance))
+
+    @property
+    def outstanding(self) -> int:
+        with self._lock:
+            return self._outstanding
+
+    def _take(self, block: bool, timeout: float = None) -> tuple:
+        result = self._results.get(block, timeout)
+        with self._lock:
+            self._outstanding -= 1
+        return result
+
+    def completed(self) -> list:
+        """已经完成的检查结果(index, term, balance)，不等待，读取积分失败时balance为0。"""
+        results = []
+        while True:
+            try:
+                results.append(self._take(False))
+            except queue.Empty:
+                return results
+
+    def drain(self, timeout: float = DRAIN_TIMEOUT) -> list:
+        """等待所有已登记的检查完成，返回剩余的检查结果，等待期间让出执行权。"""
+        results = []
+        deadline = time.monotonic() + timeout
+        start = time.perf_counter()
+        with idling():
+            while self.outstanding > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logging.warning(f"{LOG_TAG} 还有 {self.outstanding} 次搜索的积分检查未完成")
+                    break
+                try:
+                    results.append(self._take(True, remaining))
+                except queue.Empty:
+                    continue
+        tracing.recordSleep(start, time.perf_counter() - start)
+        return results
+
+    def close(self):
+        self._pending.put(None)
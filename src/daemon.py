@@ -0,0 +1,308 @@
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from src import tracing
+from src.browser import Browser
+from src.checkpoint import CheckpointJournal
+from src.notifier import Notifier
+
+LOG_TAG = "[CMY][DAEMON]"
+
+# 账号未配置start_time且config.json中未配置daemon_start_time时的默认启动时间
+DEFAULT_START_TIME = "08:00"
+# 账号执行出错后第一次重试前等待的时间，之后每次翻倍
+RETRY_BACKOFF = timedelta(minutes=5)
+# 每个账号每天最多执行的次数，超过后当天不再重试
+MAX_ATTEMPTS_PER_DAY = 3
+
+
+class WarmBrowserPool:
+    """
+    预先启动并登录好的浏览器池。
+
+    在账号计划启动时间之前，在后台线程中启动浏览器并完成登录，
+    到启动时间时直接取出使用，账号的执行可以在几秒内开始。
+    """
+
+    def __init__(self, factory: Callable[[dict], Browser], size: int = 2):
+        self.factory = factory
+        self.size = max(0, int(size))
+        self._browsers: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, self.size), thread_name_prefix="warmup"
+        )
+
+    def warm(self, account: dict):
+        username = account["username"]
+        with self._lock:
+            if username in self._browsers or len(self._browsers) >= self.size:
+                return
+            logging.info(f"{LOG_TAG} {username} 预启动浏览器")
+            self._browsers[username] = self._executor.submit(self.factory, account)
+
+    def take(self, username: str) -> Optional[Browser]:
+        """
+        取出账号的预启动浏览器，仍在启动中时等待其完成。没有可用的浏览器时返回None。
+        """
+        with self._lock:
+            future = self._browsers.pop(username, None)
+        if future is None:
+            return None
+        try:
+            browser = future.result()
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(f"{LOG_TAG} {username} 预启动浏览器失败: {e}")
+            return None
+        if not browser.isSessionValid():
+            logging.warning(f"{LOG_TAG} {username} 预启动的浏览器会话已失效")
+            browser.closeBrowser()
+            return None
+        return browser
+
+    def discard(self, username: str):
+        browser = self.take(username)
+        if browser is not None:
+            browser.closeBrowser()
+
+    def usernames(self) -> list:
+        with self._lock:
+            return list(self._browsers)
+
+    def close(self):
+        for username in self.usernames():
+            self.discard(username)
+        self._executor.shutdown(wait=False)
+
+
+class Daemon:
+    """
+    常驻运行模式。
+
+    常驻进程中只需要导入一次依赖，accounts.json和config.json修改后自动重新加载，
+    每个账号每天在配置的时间（账号的start_time或config.json中的daemon_start_time）执行一次。
+    单个账号配置错误或执行出错时只记录日志并稍后重试，不影响常驻进程和其他账号。
+    """
+
+    def __init__(
+        self,
+        accountsPath: Path,
+        config: dict,
+        notifier: Notifier,
+        runAccount: Callable[[dict, Optional[Browser]], str],
+        browserFactory: Callable[[dict], Browser],
+        configPath: Optional[Path] = None,
+    ):
+        self.accountsPath = accountsPath
+        self.configPath = configPath
+        # 重新加载时原地更新，与调用方共享同一个配置字典
+        self.config = config
+        self.notifier = notifier
+        self.runAccount = runAccount
+        self.pool = WarmBrowserPool(browserFactory, config.get("daemon_warm_browsers", 2))
+        self.applyConfig()
+        self.accounts: list = []
+        self._accountsMtime = None
+        self._configMtime = self.mtime(configPath) if configPath else None
+        # 每个账号最后一次执行的日期
+        self.lastRunDate: dict[str, date] = {}
+        # 每个账号当天出错的次数和下次重试的时间
+        self.failures: dict[str, tuple] = {}
+        self.retryAt: dict[str, datetime] = {}
+        # 断点日志中已记录当天完成的账号
+        self.finishedDate: dict[str, date] = {}
+        self.results: dict[str, str] = {}
+        self.notifiedDate: Optional[date] = None
+
+    def applyConfig(self):
+        self.tickSeconds = self.config.get("daemon_tick_seconds", 30)
+        self.warmupLead = timedelta(minutes=self.config.get("daemon_warmup_minutes", 10))
+        self.defaultStartTime = self.config.get("daemon_start_time", DEFAULT_START_TIME)
+        self.pool.size = max(0, int(self.config.get("daemon_warm_browsers", 2)))
+
+    def run(self):
+        logging.info(f"{LOG_TAG} 常驻模式已启动")
+        try:
+            while True:
+                self.reloadConfigIfChanged()
+                self.reloadAccountsIfChanged()
+                now = datetime.now()
+                for account in self.accounts:
+                    self.guarded(account, now, self.warmIfDue)
+                for account in self.accounts:
+                    self.guarded(account, now, self.executeIfDue)
+                try:
+                    self.notifyIfRoundFinished()
+                except Exception as e:  # pylint: disable=broad-except
+                    logging.error(f"{LOG_TAG} 发送汇总通知失败: {e}")
+                tracing.sleep(self.tickSeconds)
+        finally:
+            logging.info(f"{LOG_TAG} 常驻模式退出，关闭预启动的浏览器")
+            self.pool.close()
+            tracing.flush()
+
+    def guarded(self, account: dict, now: datetime, action: Callable[[dict, datetime], None]):
+        """执行单个账号的调度操作，出错时记录日志并推迟该账号的下次尝试。"""
+        username = account["username"]
+        retryAt = self.retryAt.get(username)
+        if retryAt is not None and now < retryAt:
+            return
+        try:
+            action(account, now)
+        except Exception as e:  # pylint: disable=broad-except
+            self.recordFailure(username, now, e)
+
+    def recordFailure(self, username: str, now: datetime, error: Exception):
+        day, count = self.failures.get(username, (now.date(), 0))
+        count = count + 1 if day == now.date() else 1
+        self.failures[username] = (now.date(), count)
+        if count >= MAX_ATTEMPTS_PER_DAY:
+            logging.error(
+                f"{LOG_TAG} {username} 今天已出错{count}次，今天不再执行: {error.__class__.__name__}: {error}"
+            )
+            self.lastRunDate[username] = now.date()
+            self.results[username] = f"{username} 执行失败: {error}"
+            self.pool.discard(username)
+            return
+        delay = RETRY_BACKOFF * 2 ** (count - 1)
+        self.retryAt[username] = now + delay
+        logging.error(
+            f"{LOG_TAG} {username} 执行出错，{int(delay.total_seconds() // 60)}分钟后重试: "
+            f"{error.__class__.__name__}: {error}"
+        )
+
+    @staticmethod
+    def mtime(path: Path) -> Optional[float]:
+        try:
+            return path.stat().st_mtime
+        except OSError as e:
+            logging.error(f"{LOG_TAG} 无法读取文件 {path}: {e}")
+            return None
+
+    def reloadConfigIfChanged(self):
+        """config.json修改后重新读取，下一个账号开始执行时使用新的配置。"""
+        if self.configPath is None:
+            return
+        mtime = self.mtime(self.configPath)
+        if mtime is None or mtime == self._configMtime:
+            return
+        try:
+            config = json.loads(self.configPath.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logging.error(f"{LOG_TAG} 配置文件解析失败，继续使用之前的配置: {e}")
+            return
+        self._configMtime = mtime
+        self.config.clear()
+        self.config.update(config)
+        try:
+            self.applyConfig()
+        except (TypeError, ValueError) as e:
+            logging.error(f"{LOG_TAG} 常驻模式配置项格式错误: {e}")
+        # daemon_start_time可能已经变化，重新检查账号的启动时间
+        self._accountsMtime = None
+        logging.info(f"{LOG_TAG} 已重新加载配置文件")
+
+    def validAccounts(self, accounts: list) -> list:
+        """去掉缺少username或start_time格式错误的账号，其他账号照常执行。"""
+        valid = []
+        for index, account in enumerate(accounts):
+            if not isinstance(account, dict) or not account.get("username"):
+                logging.error(f"{LOG_TAG} 第{index + 1}个账号缺少username，跳过")
+                continue
+            try:
+                self.startTime(account, date.today())
+            except (AttributeError, ValueError) as e:
+                logging.error(
+                    f"{LOG_TAG} {account['username']} 的start_time格式错误"
+                    f"（{account.get('start_time', self.defaultStartTime)}），应为HH:MM，跳过: {e}"
+                )
+                continue
+            valid.append(account)
+        return valid
+
+    def reloadAccountsIfChanged(self):
+        mtime = self.mtime(self.accountsPath)
+        if mtime is None or mtime == self._accountsMtime:
+            return
+        try:
+            accounts = json.loads(self.accountsPath.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            # 文件可能正在被编辑，下次检查时再读取
+            logging.error(f"{LOG_TAG} 账号文件解析失败，继续使用之前的账号: {e}")
+            return
+        if not isinstance(accounts, list):
+            logging.error(f"{LOG_TAG} 账号文件格式错误，应为账号列表，继续使用之前的账号")
+            return
+        self._accountsMtime = mtime
+        accounts = self.validAccounts(accounts)
+        self.accounts = accounts
+        usernames = {account["username"] for account in accounts}
+        for username in self.pool.usernames():
+            if username not in usernames:
+                self.pool.discard(username)
+        logging.info(f"{LOG_TAG} 已加载 {len(accounts)} 个账号")
+
+    def startTime(self, account: dict, day: date) -> datetime:
+        hour, minute = account.get("start_time", self.defaultStartTime).split(":")
+        return datetime.combine(day, datetime.min.time()).replace(
+            hour=int(hour), minute=int(minute)
+        )
+
+    def warmIfDue(self, account: dict, now: datetime):
+        if self.isDue(account, now + self.warmupLead) and not self.isFinishedToday(account):
+            self.pool.warm(account)
+
+    def executeIfDue(self, account: dict, now: datetime):
+        if self.isDue(account, now):
+            self.executeAccount(account)
+
+    def isDue(self, account: dict, moment: datetime) -> bool:
+        if self.lastRunDate.get(account["username"]) == moment.date():
+            return False
+        return moment >= self.startTime(account, moment.date())
+
+    def isFinishedToday(self, account: dict) -> bool:
+        username = account["username"]
+        today = date.today()
+        # 当天已经完成的账号不再读取断点日志
+        if self.finishedDate.get(username) == today:
+            return True
+        with CheckpointJournal(
+            username, enabled=self.config.get("enable_checkpoint", True)
+        ) as journal:
+            finished = journal.isStageDone("finished")
+        if finished:
+            self.finishedDate[username] = today
+        return finished
+
+    def executeAccount(self, account: dict):
+        username = account["username"]
+        browser = self.pool.take(username)
+        logging.info(
+            f"{LOG_TAG} {username} 开始执行{'（使用预启动的浏览器）' if browser else ''}"
+        )
+        self.results[username] = self.runAccount(account, browser)
+        # 执行完成后才记为当天已执行，出错时由guarded推迟后重试
+        self.lastRunDate[username] = date.today()
+        self.retryAt.pop(username, None)
+
+    def notifyIfRoundFinished(self):
+        """当天所有账号都执行完成后发送一次汇总通知。"""
+        today = date.today()
+        if self.notifiedDate == today or not self.accounts:
+            return
+        if any(self.lastRunDate.get(account["username"]) != today for account in self.accounts):
+            return
+        self.notifiedDate = today
+        result_message = "\n".join(
+            self.results[account["username"]]
+            for account in self.accounts
+            if self.results.get(account["username"])
+        )
+        self.notifier.wechat("执行完成", f"所有账号执行结果如下：\n{result_message}")
+        tracing.flush()
@@ -3,23 +3,28 @@ import urllib.parse
 from datetime import datetime
 
 from src.browser import Browser
+from src.checkpoint import CheckpointJournal
 
 from .activities import Activities
 
 
 class DailySet:
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, journal: CheckpointJournal = None):
         self.browser = browser
         self.webdriver = browser.webdriver
         self.activities = Activities(browser)
+        self.journal = journal
 
     def completeDailySet(self):
         logging.info("[DAILY SET] " + "Trying to complete the Daily Set...")
-        self.browser.utils.goHome()
-        data = self.browser.utils.getDashboardData()["dailySetPromotions"]
+        self.browser.utils.ensureHome(strict=False)
+        data = self.browser.utils.queryDashboard(["dailySetPromotions"])["dailySetPromotions"]
         todayDate = datetime.now().strftime("%m/%d/%Y")
         for activity in data.get(todayDate, []):
             logging.info(f'[DAILY SET] activity["title"] = {activity["title"]}, activity["complete"] = {activity["complete"]}')
+            if self.journal is not None and self.journal.isActivityDone(activity.get("offerId")):
+                logging.info(f'[DAILY SET] {activity["title"]} 已在断点日志中完成，跳过')
+                continue
             try:
                 if activity["complete"] is False:
                     cardId = int(activity["offerId"][-1:])
@@ -81,6 +86,17 @@ class DailySet:
                                     self.activities.completeABC()
                                 except Exception:  # pylint: disable=broad-except
                                     self.activities.completeQuiz()
+                    self.browser.utils.invalidateDashboard()
+                    self.recordActivity(activity)
             except Exception:  # pylint: disable=broad-except
                 self.browser.utils.resetTabs()
         logging.info("[DAILY SET] Completed the Daily Set successfully !")
+
+    def recordActivity(self, activity: dict):
+        """dashboard中显示活动已完成时才写入断点日志，未完成的活动重新运行时会再次执行。"""
+        if self.journal is None:
+            return
+        if self.browser.utils.isOfferComplete(activity.get("offerId")):
+            self.journal.markActivityDone(activity.get("offerId"))
+        else:
+            logging.warning(f'[DAILY SET] {activity["title"]} 执行后仍未完成，不写入断点日志')
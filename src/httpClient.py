@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+
+LOG_TAG = "[CMY][HTTP]"
+
+# 默认的连接超时和读取超时（秒）
+DEFAULT_TIMEOUT = (10, 30)
+# 每个域名保持的连接数
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 8
+# 浏览器Cookie同步的最小间隔（秒）
+COOKIE_SYNC_INTERVAL = 5
+
+
+class RejectAllCookiePolicy(DefaultCookiePolicy):
+    """不保存任何响应中的Cookie。"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class PooledSession(requests.Session):
+    """
+    按域名复用连接的Session，未指定timeout的请求使用DEFAULT_TIMEOUT。
+
+    Session由所有账号共享，Cookie Jar不保存响应中的Cookie，避免一个账号的Cookie随另一个账号的请求发送，
+    请求需要的Cookie只通过cookies参数传入（来自BrowserCookieBridge）。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cookies = RequestsCookieJar(policy=RejectAllCookiePolicy())
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+_session = None
+_sessionLock = threading.Lock()
+
+
+def getSession() -> PooledSession:
+    """进程内共享的Session，所有HTTP请求都通过它发送以复用连接。"""
+    global _session
+    with _sessionLock:
+        if _session is None:
+            _session = PooledSession()
+        return _session
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return getSession().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return getSession().post(url, **kwargs)
+
+
+class BrowserCookieBridge:
+    """
+    把浏览器的Cookie同步到RequestsCookieJar中，供HTTP请求使用。
+
+    通过CDP的Network.getAllCookies读取所有域名的Cookie，只更新发生变化的Cookie，
+    两次同步之间至少间隔COOKIE_SYNC_INTERVAL秒，避免每次请求都读取浏览器的Cookie。
+    """
+
+    def __init__(self, webdriver, syncInterval: float = COOKIE_SYNC_INTERVAL):
+        self.webdriver = webdriver
+        self.syncInterval = syncInterval
+        self.jar = RequestsCookieJar()
+        # (domain, path, name)到value的映射，用于计算变化的Cookie
+        self._known: dict = {}
+        self._syncedAt = None
+        self._lock = threading.Lock()
+
+    def markStale(self):
+        """浏览器的Cookie可能已经变化（例如登录、切换账号）时调用，下次使用时强制同步。"""
+        with self._lock:
+            self._syncedAt = None
+
+    def sync(self, force: bool = False) -> RequestsCookieJar:
+        with self._lock:
+            if (
+                not force
+                and self._syncedAt is not None
+                and time.monotonic() - self._syncedAt < self.syncInterval
+            ):
+                return self.jar
+            try:
+                cookies = self.webdriver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+            except Exception as e:  # pylint: disable=broad-except
+                logging.warning(f"{LOG_TAG} 读取浏览器Cookie失败，使用上次同步的Cookie: {e}")
+                return self.jar
+            current = {}
+            for cookie in cookies:
+                key = (cookie["domain"], cookie.get("path", "/"), cookie["name"])
+                current[key] = cookie["value"]
+                if self._known.get(key) != cookie["value"]:
+                    self.jar.set(
+                        cookie["name"],
+                        cookie["value"],
+                        domain=cookie["domain"],
+                        path=cookie.get("path", "/"),
+                        secure=cookie.get("secure", False),
+                    )
+            for domain, path, name in self._known.keys() - current.keys():
+                self.jar.clear(domain, path, name)
+            self._known = current
+            self._syncedAt = time.monotonic()
+            return self.jar
+
+    def cookiesFor(self, host: str, path: str = "/") -> dict:
+        """
+        会随请求发送到host上path的Cookie，返回name到value的字典。
+
+        不同域名或路径下有同名Cookie时（例如.bing.com和cn.bing.com下都有的_U），
+        与浏览器一样使用域名最具体、其次路径最长的那一个，结果不依赖Cookie Jar的遍历顺序。
+        """
+        jar = self.sync()
+        with self._lock:
+            cookies = list(jar)
+        matched = {}
+        for cookie in cookies:
+            domain = cookie.domain.lstrip(".")
+            if not (host == domain or host.endswith("." + domain)):
+                continue
+            if not pathMatches(path, cookie.path or "/"):
+                continue
+            specificity = (len(domain), len(cookie.path or "/"))
+            if cookie.name not in matched or specificity > matched[cookie.name][0]:
+                matched[cookie.name] = (specificity, cookie.value)
+        return {name: value for name, (_, value) in matched.items()}
+
+
+def pathMatches(requestPath: str, cookiePath: str) -> bool:
+    """RFC 6265中的路径匹配：cookiePath等于requestPath，或是requestPath按“/”划分的前缀。"""
+    if requestPath == cookiePath:
+        return True
+    return requestPath.startswith(cookiePath) and (
+        cookiePath.endswith("/") or requestPath[len(cookiePath)] == "/"
+    )
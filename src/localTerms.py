@@ -0,0 +1,113 @@
+import logging
+import mmap
+import random
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+LOG_TAG = "[CMY][TERMS]"
+
+CORPUS_PATH = Path(__file__).resolve().parent / "data" / "search_corpus.txt"
+TEMPLATE_SECTION = "template"
+SLOT_PATTERN = re.compile(r"\{(\w+)\}")
+# 连续生成重复搜索词的次数超过该值时认为组合已经用尽
+MAX_DUPLICATE_STREAK = 1000
+
+
+class Corpus:
+    """
+    内存映射的语料文件。
+
+    只在加载时扫描一遍文件记录每一行的位置，每一项在被选中时才从映射中解码。
+    """
+
+    def __init__(self, path: Path = CORPUS_PATH):
+        self.path = path
+        self._file = open(path, "rb")  # pylint: disable=consider-using-with
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        # 分组名到该分组中每一行(起始, 结束)位置的映射
+        self.sections: dict[str, list] = {}
+        self._index()
+
+    def _index(self):
+        current = None
+        position = 0
+        size = len(self._map)
+        while position < size:
+            end = self._map.find(b"\n", position)
+            if end == -1:
+                end = size
+            line = self._map[position:end].strip()
+            if line and not line.startswith(b"#"):
+                if line.startswith(b"[") and line.endswith(b"]"):
+                    current = line[1:-1].decode("utf-8")
+                    self.sections.setdefault(current, [])
+                elif current is not None:
+                    self.sections[current].append((position, end))
+            position = end + 1
+
+    def item(self, section: str, index: int) -> str:
+        start, end = self.sections[section][index]
+        return self._map[start:end].decode("utf-8").strip()
+
+    def choice(self, section: str, rng: random.Random) -> str:
+        return self.item(section, rng.randrange(len(self.sections[section])))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class LocalTermGenerator:
+    """
+    不需要网络的搜索词生成器，按语料中的模板随机组合出搜索词。
+
+    热门搜索词获取失败或数量不够时使用，同一个生成器生成的搜索词不会重复。
+    """
+
+    def __init__(self, corpus: Corpus, seed: Optional[int] = None):
+        self.corpus = corpus
+        self.rng = random.Random(seed)
+        self._templates = [
+            corpus.item(TEMPLATE_SECTION, index)
+            for index in range(len(corpus.sections.get(TEMPLATE_SECTION, [])))
+        ]
+        self._generated: set = set()
+        self._lock = threading.Lock()
+
+    def _fill(self, template: str) -> str:
+        return SLOT_PATTERN.sub(lambda match: self.corpus.choice(match.group(1), self.rng), template)
+
+    def generate(self, count: int, exclude: Iterable[str] = ()) -> list:
+        """
+        生成count个之前没有生成过、也不在exclude中的搜索词，组合用尽时返回的数量可能少于count。
+        """
+        excluded = set(exclude)
+        terms = []
+        duplicateStreak = 0
+        with self._lock:
+            while len(terms) < count and duplicateStreak < MAX_DUPLICATE_STREAK:
+                term = self._fill(self.rng.choice(self._templates))
+                if term in self._generated or term in excluded:
+                    duplicateStreak += 1
+                    continue
+                duplicateStreak = 0
+                self._generated.add(term)
+                terms.append(term)
+        if len(terms) < count:
+            logging.warning(f"{LOG_TAG} 本地搜索词组合已用尽，只生成了 {len(terms)} 个")
+        return terms
+
+
+_generator: Optional[LocalTermGenerator] = None
+_generatorLock = threading.Lock()
+
+
+def getLocalTermGenerator() -> LocalTermGenerator:
+    """进程内共享的生成器，第一次使用时才加载语料。"""
+    global _generator
+    with _generatorLock:
+        if _generator is None:
+            _generator = LocalTermGenerator(Corpus())
+        return _generator
@@ -1,11 +1,13 @@
 import contextlib
 import logging
-import time
 import urllib.parse
 
 from selenium.webdriver.common.by import By
 
+from src import tracing, waits
 from src.browser import Browser
+from src.cookieStore import CookieStore, cookiesForHost, toCookieParams
+from src.utils import probeSpec
 
 LOG_TAG = "[CMY]"
 
@@ -15,61 +17,135 @@ class Login:
         self.webdriver = browser.webdriver
         self.utils = browser.utils
 
+    @tracing.traced("login.login", "login")
     def login(self):
         logging.info("[LOGIN] " + "Logging-in...")
-        try:
-            self.webdriver.get("https://login.live.com/")
-        except Exception:  # pylint: disable=broad-except
-            logging.error(f"{LOG_TAG} '无法打开登录页面 https://login.live.com/，尝试刷新页面...', Exception: {str(e)}")
-            self.webdriver.refresh()
-            time.sleep(10)
-        alreadyLoggedIn = False # 初始化已登录状态为 False
-        while True:
-            try:
-                # 尝试等待页面加载出表示已登录的元素
-                self.utils.waitUntilVisible(
-                    By.CSS_SELECTOR, 'html[data-role-name="MeePortal"]', 5
-                )
-                # 若找到元素，说明用户已登录，更新状态并跳出循环
-                alreadyLoggedIn = True
-                logging.info(f"用户已登录，跳过登录流程...")
-                break
-            except Exception:  # pylint: disable=broad-except
-                try:
-                    # 若未找到已登录元素，尝试等待登录页面的头部元素
-                    self.utils.waitUntilVisible(By.ID, "usernameEntry", 5)
-                    # 若找到登录头部元素，说明用户未登录，跳出循环
-                    logging.info(f"{LOG_TAG} '用户未登录，继续执行登录流程...'")
-                    break
-                except Exception:  # pylint: disable=broad-except
-                    logging.info(f"{LOG_TAG} '未找到已登录元素或登录头部元素，继续尝试...'")
-                    # 若既未找到已登录元素也未找到登录头部元素，尝试关闭所有弹窗
-                    if self.utils.tryDismissAllMessages():
-                        # 刷新页面
-                        self.webdriver.refresh()
-                        # 等待10s
-                        time.sleep(10)
-                        continue
-        # 如果用户未登录，则执行登录流程
-        if not alreadyLoggedIn:
-            self.executeLogin()
-        # 尝试关闭页面的 Cookie 横幅
-        self.utils.tryDismissCookieBanner()
+        cookieStore = self.createCookieStore()
+        # 优先通过Cookie快照恢复登录状态，恢复失败时才执行交互式登录
+        restored = cookieStore is not None and self.restoreCookies(cookieStore)
+        if not restored:
+            self.openLoginPage()
+            alreadyLoggedIn = self.detectLoginState()
+            # 如果用户未登录，则执行登录流程
+            if not alreadyLoggedIn:
+                self.executeLogin()
+            # 尝试关闭页面的 Cookie 横幅
+            self.utils.tryDismissCookieBanner()
 
         logging.info("[LOGIN] " + "Logged-in !")
 
-        self.utils.goHome()
+        # 登录后仍然无法打开rewards主页时直接失败，不再继续读取积分
+        self.utils.ensureHome()
         logging.info("[LOGIN] " + "after goHome in login")
-        points = self.utils.getAccountPoints()
+        with tracing.span("login.getAccountPoints", "login"):
+            points = self.utils.getAccountPoints()
         logging.info(
             f"[POINTS][login.py] You have {self.utils.formatNumber(points)} points on your account!"
         )
 
-        logging.info("[LOGIN] " + "Ensuring login on Bing...")
-        self.checkBingLogin()
+        if restored:
+            bingLoggedIn = True
+        else:
+            logging.info("[LOGIN] " + "Ensuring login on Bing...")
+            bingLoggedIn = self.checkBingLogin()
+        if cookieStore is not None and bingLoggedIn:
+            self.saveCookies(cookieStore)
         logging.info("[LOGIN] Logged-in successfully !")
+        self.browser.loginPoints = points
         return points
 
+    def createCookieStore(self):
+        if not self.browser.config.get("enable_cookie_store", False):
+            return None
+        return CookieStore(
+            self.browser.username,
+            self.browser.password,
+            self.browser.config.get("cookie_snapshot_max_age_days", 7),
+        )
+
+    @tracing.traced("login.restoreCookies", "login")
+    def restoreCookies(self, cookieStore: CookieStore) -> bool:
+        """
+        通过CDP注入Cookie快照，并用一次getBingInfo请求确认登录状态有效。
+
+        Returns:
+            bool: 恢复成功返回True。
+        """
+        cookies = cookieStore.load()
+        if not cookies:
+            return False
+        try:
+            self.webdriver.execute_cdp_cmd(
+                "Network.setCookies", {"cookies": toCookieParams(cookies)}
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"[LOGIN] 注入Cookie快照失败: {e}")
+            return False
+        data = self.utils.getBingInfo(
+            cookies=cookiesForHost(cookies, "cn.bing.com"), maxTries=1
+        )
+        # Cookie过期时接口可能只返回部分字段，没有isRewardsUser时视为快照失效
+        if data and (data.get("userInfo") or {}).get("isRewardsUser"):
+            logging.info("[LOGIN] 已通过Cookie快照恢复登录状态，跳过登录流程")
+            return True
+        logging.info("[LOGIN] Cookie快照已失效，执行登录流程")
+        cookieStore.clear()
+        with contextlib.suppress(Exception):
+            self.webdriver.delete_all_cookies()
+        return False
+
+    def saveCookies(self, cookieStore: CookieStore):
+        try:
+            cookies = self.webdriver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"[LOGIN] 读取Cookie失败，未保存快照: {e}")
+            return
+        cookieStore.save(cookies)
+
+    @tracing.traced("login.openLoginPage", "login")
+    def openLoginPage(self):
+        try:
+            self.webdriver.get("https://login.live.com/")
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(f"{LOG_TAG} '无法打开登录页面 https://login.live.com/，尝试刷新页面...', Exception: {str(e)}")
+            self.webdriver.refresh()
+            waits.waitForLoad(self.webdriver, 10)
+
+    @tracing.traced("login.detectLoginState", "login")
+    def detectLoginState(self) -> bool:
+        """
+        判断当前是已登录页面还是登录页面。
+
+        Returns:
+            bool: 已登录返回True，需要登录返回False。
+        """
+        while True:
+            # 同时等待表示已登录的元素和登录页面的头部元素，任意一个出现时立即返回
+            found = waits.waitForAny(
+                self.webdriver,
+                [
+                    (By.CSS_SELECTOR, 'html[data-role-name="MeePortal"]'),
+                    (By.ID, "usernameEntry"),
+                ],
+                10,
+                visible=True,
+            )
+            if found == 0:
+                # 若找到元素，说明用户已登录
+                logging.info("用户已登录，跳过登录流程...")
+                return True
+            if found == 1:
+                # 若找到登录头部元素，说明用户未登录
+                logging.info(f"{LOG_TAG} '用户未登录，继续执行登录流程...'")
+                return False
+            logging.info(f"{LOG_TAG} '未找到已登录元素或登录头部元素，继续尝试...'")
+            # 若既未找到已登录元素也未找到登录头部元素，尝试关闭所有弹窗
+            if self.utils.tryDismissAllMessages():
+                # 刷新页面
+                self.webdriver.refresh()
+                waits.waitForLoad(self.webdriver, 10)
+
+    @tracing.traced("login.executeLogin", "login")
     def executeLogin(self):
         self.utils.waitUntilVisible(By.ID, "usernameEntry", 30)
         logging.info("[LOGIN] " + "Writing email...")
@@ -82,11 +158,12 @@ class Login:
         self.webdriver.find_element(By.CSS_SELECTOR, '[data-testid="primaryButton"]').click()
         logging.info("[LOGIN] " + "finded primaryButton")
 
-        time.sleep(5)
+        # 等待下一步页面加载完成，最多5秒
+        waits.waitForNetworkIdle(self.webdriver, 5)
         # 跳过移动端登陆时在github上登陆，选择其它登陆方法
-        title_elements = self.webdriver.find_elements(By.CSS_SELECTOR, '[data-testid="title"]')
-        for title_element in title_elements:
-            if "在 GitHub 上登录" in title_element.text:
+        titles = self.getTitles()
+        for title in titles:
+            if "在 GitHub 上登录" in title:
                 logging.info(f"[LOGIN] 在 GitHub 上登录")
                 try:
                     # 使用 CSS 选择器结合 xpath 定位包含 "使用密码" 文本的按钮
@@ -98,14 +175,14 @@ class Login:
                 except Exception as e:
                     logging.error(f"[LOGIN] Failed to find or click '其他登录方法' button: {e}")
         logging.info("[LOGIN] " + "after for 在 GitHub 上登录")
-        time.sleep(5)
+        waits.waitForNetworkIdle(self.webdriver, 5)
 
         # 尝试跳过 [获取用于登录的代码] 选择框
         # 找到所有data-testid="title"的元素
-        title_elements = self.webdriver.find_elements(By.CSS_SELECTOR, '[data-testid="title"]')
+        titles = self.getTitles()
         # 遍历所有data-testid="title"的元素,判断文本中是否包含"获取用于登录的代码",尝试跳过
-        for title_element in title_elements:
-            if "使用另一种方式登录" in title_element.text:
+        for title in titles:
+            if "使用另一种方式登录" in title:
                 logging.info(f"[LOGIN] 使用另一种方式登录")
                 try:
                     # 使用 CSS 选择器结合 xpath 定位包含 "使用密码" 文本的按钮
@@ -118,7 +195,7 @@ class Login:
                 except Exception as e:
                     logging.error(f"[LOGIN] Failed to find or click '使用密码' button: {e}")
 
-            if "获取用于登录的代码" in title_element.text:
+            if "获取用于登录的代码" in title:
                 logging.info(f"[LOGIN] 登录有密码和邮箱两种")
                 try:
                     # 使用 CSS 选择器结合 xpath 定位包含 "使用密码" 文本的按钮
@@ -138,16 +215,16 @@ class Login:
 
             # 尝试跳过输入密码后出现的 [使用人脸、指纹或 PIN 更快地登录] 选择框
             # 找到所有data-testid="title"的元素
-            title_elements = self.webdriver.find_elements(By.CSS_SELECTOR, '[data-testid="title"]')
+            titles = self.getTitles()
             # 遍历所有data-testid="title"的元素,判断文本中是否包含"获取用于登录的代码",尝试跳过
-            for title_element in title_elements:
-                if "使用人脸、指纹或 PIN 更快地登录" in title_element.text:
+            for title in titles:
+                if "使用人脸、指纹或 PIN 更快地登录" in title:
                     logging.info(f"[LOGIN] 使用人脸、指纹或 PIN 更快地登录 选择框出现")
                     try:
                         # 找到data-testid="secondaryButton"的元素并点击它, 这是跳过按钮
                         self.utils.waitUntilClickable(By.CSS_SELECTOR, '[data-testid="secondaryButton"]', 30)
                         self.webdriver.find_element(By.CSS_SELECTOR, '[data-testid="secondaryButton"]').click()
-                        time.sleep(10)
+                        waits.waitForNetworkIdle(self.webdriver, 10)
                         logging.info("[LOGIN] Clicked '跳过' button.")
                     except Exception as e:
                         logging.error(f"[LOGIN] Failed to find or click '跳过' button: {e}")
@@ -169,7 +246,7 @@ class Login:
             except Exception:  # pylint: disable=broad-except
                 logging.error(f"{LOG_TAG} '无法打开登录页面 https://account.microsoft.com/，尝试刷新页面...', Exception: {str(e)}")
                 self.webdriver.refresh()
-            time.sleep(15)
+            waits.waitForElement(self.webdriver, By.CSS_SELECTOR, 'html[data-role-name="MeePortal"]', 15)
         while not (
             urllib.parse.urlparse(self.webdriver.current_url).path == "/"
             and urllib.parse.urlparse(self.webdriver.current_url).hostname
@@ -195,7 +272,7 @@ class Login:
 
             logging.info(f"[LOGIN] 第{matrix}次：is in account.microsoft.com, waiting...")
             self.utils.tryDismissAllMessages()
-            time.sleep(15)
+            waits.waitForElement(self.webdriver, By.CSS_SELECTOR, 'html[data-role-name="MeePortal"]', 15)
 
             matrix += 1
             # 尝试跳转到网页 https://account.microsoft.com/
@@ -207,7 +284,7 @@ class Login:
                     # 如果出现异常，打印错误信息，并刷新页面
                     logging.error(f"{LOG_TAG} '无法打开登录页面 https://account.microsoft.com/，尝试刷新页面...', Exception: {str(e)}")
                     self.webdriver.refresh()
-                time.sleep(15)
+                waits.waitForElement(self.webdriver, By.CSS_SELECTOR, 'html[data-role-name="MeePortal"]', 15)
             else:
                 logging.error("[LOGIN] WebDriver is None, cannot proceed to navigate.")
                 raise RuntimeError("WebDriver is not initialized.")
@@ -223,6 +300,17 @@ class Login:
             By.CSS_SELECTOR, 'html[data-role-name="MeePortal"]', 30
         )
 
+    def getTitles(self) -> list:
+        """一次读取页面上所有data-testid="title"元素的文本。"""
+        try:
+            (titles,) = self.utils.probe(
+                [probeSpec(By.CSS_SELECTOR, '[data-testid="title"]', text=True, findAll=True)]
+            )
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"[LOGIN] 读取页面标题失败: {e}")
+            return []
+        return [title["text"] or "" for title in titles]
+
     def enterPassword(self, password):
         self.utils.waitUntilClickable(By.NAME, "passwd", 30)
         logging.info("[LOGIN] " + "waitUntilClickable(By.NAME, 'passwd', 10)")
@@ -237,8 +325,9 @@ class Login:
         logging.info("[LOGIN] " + "Writing password...")
         self.webdriver.find_element(By.CSS_SELECTOR, '[data-testid="primaryButton"]').click()
         logging.info("[LOGIN] " + "Clicking login button...")
-        time.sleep(5)
+        waits.waitForNetworkIdle(self.webdriver, 5)
 
+    @tracing.traced("login.checkBingLogin", "login")
     def checkBingLogin(self):
         max_retries = 30  # 最大重试次数
         retry_count = 0
@@ -258,18 +347,20 @@ class Login:
                 f"[LOGIN][checkBingLogin] " + f"Current URL: {currentUrl}" )
             if currentUrl.hostname == "cn.bing.com" and currentUrl.path == "/":
                 logging.info("[LOGIN] " + "currentUrl.hostname == 'cn.bing.com' and currentUrl.path == '/'")
-                time.sleep(3)
+                waits.waitForNetworkIdle(self.webdriver, 3)
                 self.utils.tryDismissBingCookieBanner()
                 with contextlib.suppress(Exception):
                     if self.utils.checkBingLogin():
                         logging.info("[LOGIN] " + "Bing login successful!")
-                        return
-            time.sleep(1)
+                        return True
+            tracing.sleep(1)
             retry_count += 1
             try:
                 self.webdriver.get("https://cn.bing.com/")
             except Exception:  # pylint: disable=broad-except
                 logging.error(f"{LOG_TAG} '无法打开登录页面 https://cn.bing.com/，尝试刷新页面...', Exception: {str(e)}")
                 self.webdriver.refresh()
-            time.sleep(10)
-        logging.error("[LOGIN] Bing login failed after multiple attempts.")
\ No newline at end of file
+            # 等待登录跳转完成
+            waits.waitForNetworkIdle(self.webdriver, 10)
+        logging.error("[LOGIN] Bing login failed after multiple attempts.")
+        return False
\ No newline at end of file
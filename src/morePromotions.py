@@ -1,23 +1,30 @@
 import logging
 
 from src.browser import Browser
+from src.checkpoint import CheckpointJournal
 
 from .activities import Activities
 
 
 class MorePromotions:
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, journal: CheckpointJournal = None):
         self.browser = browser
         self.activities = Activities(browser)
+        self.journal = journal
 
     def completeMorePromotions(self):
         logging.info("[MORE PROMO] " + "Trying to complete More Promotions...")
-        morePromotions = self.browser.utils.getDashboardData()["morePromotions"]
+        # 缓存的dashboard数据不会跳转页面，点击活动卡片前需要先回到rewards页面
+        self.browser.utils.ensureHome(strict=False)
+        morePromotions = self.browser.utils.queryDashboard(["morePromotions"])["morePromotions"]
         i = 0
         for promotion in morePromotions:
             logging.info(f"[MORE PROMO][OUT] promotion['title'] = {promotion['title']}, promotion['complete'] = {promotion['complete']}")
             try:
                 i += 1
+                if self.journal is not None and self.journal.isActivityDone(promotion.get("offerId")):
+                    logging.info(f"[MORE PROMO] {promotion['title']} 已在断点日志中完成，跳过")
+                    continue
                 if (
                     promotion["complete"] is False
                     and promotion["pointProgressMax"] != 0
@@ -38,6 +45,17 @@ class MorePromotions:
                             self.activities.completeThisOrThat()
                     else:
                         self.activities.completeSearch()
+                    self.browser.utils.invalidateDashboard()
+                    self.recordPromotion(promotion)
             except Exception:  # pylint: disable=broad-except
                 self.browser.utils.resetTabs()
         logging.info("[MORE PROMO] Completed More Promotions successfully !")
+
+    def recordPromotion(self, promotion: dict):
+        """dashboard中显示活动已完成时才写入断点日志，未完成的活动重新运行时会再次执行。"""
+        if self.journal is None:
+            return
+        if self.browser.utils.isOfferComplete(promotion.get("offerId")):
+            self.journal.markActivityDone(promotion.get("offerId"))
+        else:
+            logging.warning(f"[MORE PROMO] {promotion['title']} 执行后仍未完成，不写入断点日志")
@@ -1,7 +1,7 @@
-import requests
 from pathlib import Path
 import json
 import logging
+from src import httpClient
 from src.utils import Utils
 
 MAX_LENGTHS = {
@@ -41,12 +41,12 @@ class Notifier:
         token, chat_id = self.args["telegram"]
         url = f"https://api.telegram.org/bot{token}/sendMessage"
         data = {"chat_id": chat_id, "text": message}
-        requests.post(url, data=data)
+        httpClient.post(url, data=data)
 
     def discord(self, message):
         url = self.args["discord"]
         data = {"username": "Microsoft Rewards Farmer", "content": message}
-        requests.post(url, data=data)
+        httpClient.post(url, data=data)
 
     def wechat(self, current_email, message):
         # 发送方法为get，格式为https://www.pushplus.plus/send?token=xxxx&title=XXX&content=XXX&template=html
@@ -58,7 +58,7 @@ class Notifier:
             return
         url = f"https://www.pushplus.plus/send?token={pushplus_token}&title={current_email}&content={message}&template=html"
         # 根据requests.get(url)的返回值判断是否发送成功，若返回值为200，则发送成功，否则发送失败
-        if requests.get(url).status_code == 200:
+        if httpClient.get(url).status_code == 200:
             logging.info("发送微信消息成功")
         else:
             logging.error("发送微信消息失败")
@@ -0,0 +1,162 @@
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+LOG_TAG = "[CMY][PROFILE]"
+
+# 配置文件夹旁边的锁文件（<名称>.lock），使用期间持有操作系统的文件锁，进程退出时自动释放；
+# 放在配置文件夹外面，隔离配置文件夹时锁不会跟着移走
+LOCK_SUFFIX = ".lock"
+# Chrome自身的锁文件，Chrome异常退出后会残留，导致下次启动时报session相关的错误
+CHROME_LOCK_FILES = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile")
+# 需要能被正常解析的Chrome配置文件，解析失败说明配置文件夹已损坏
+CHROME_JSON_FILES = ("Local State", "Default/Preferences")
+# 浏览器设备配置文件，隔离损坏的配置文件夹时保留
+BROWSER_CONFIG_FILE = "config.json"
+# 最多保留的已隔离配置文件夹数
+MAX_QUARANTINED = 3
+
+
+def tryLockFile(fd: int) -> bool:
+    """对整个文件加非阻塞的排他锁，已被其他进程或本进程的其他句柄锁定时返回False。"""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def unlockFile(fd: int):
+    if os.name == "nt":
+        import msvcrt
+
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class ProfileManager:
+    """
+    管理持久化的Chrome配置文件夹。
+
+    负责加锁防止多个进程同时使用同一个配置文件夹、清理Chrome异常退出后残留的锁文件，
+    以及检测并隔离已损坏的配置文件夹。
+    """
+
+    def __init__(self, profileDir: Path):
+        self.profileDir = profileDir
+        self.lockPath = profileDir.with_name(profileDir.name + LOCK_SUFFIX)
+        self._lockFd = None
+
+    @property
+    def locked(self) -> bool:
+        return self._lockFd is not None
+
+    def acquire(self) -> bool:
+        """
+        获取配置文件夹的使用权。
+
+        判断和加锁由操作系统的文件锁一步完成，多个进程同时获取时只有一个能成功；
+        锁随持有进程退出自动释放，不需要根据PID判断旧的锁是否已经失效。
+
+        Returns:
+            bool: 获取成功返回True，配置文件夹正在被其他进程使用时返回False。
+        """
+        if self.locked:
+            return True
+        self.profileDir.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lockPath, os.O_CREAT | os.O_RDWR, 0o644)
+        if not tryLockFile(fd):
+            os.close(fd)
+            logging.warning(
+                f"{LOG_TAG} 配置文件夹 {self.profileDir} 正在被其他进程使用（{self.readLockOwner()}）"
+            )
+            return False
+        self._lockFd = fd
+        # PID只用于日志中显示占用者，是否被占用以文件锁为准
+        os.ftruncate(fd, 0)
+        os.write(fd, f"pid {os.getpid()}".encode("utf-8"))
+        self.profileDir.mkdir(parents=True, exist_ok=True)
+        # 持有锁时配置文件夹中残留的Chrome锁文件一定来自已经退出的Chrome
+        self.clearChromeLocks()
+        if self.isCorrupted():
+            self.quarantine()
+        return True
+
+    def release(self):
+        if not self.locked:
+            return
+        # 不删除锁文件，删除后其他进程可能锁住不同的文件，导致两个进程同时持有锁
+        try:
+            unlockFile(self._lockFd)
+        except OSError as e:
+            logging.warning(f"{LOG_TAG} 释放锁文件失败: {e}")
+        finally:
+            os.close(self._lockFd)
+            self._lockFd = None
+
+    def readLockOwner(self) -> str:
+        try:
+            return self.lockPath.read_text(encoding="utf-8").strip() or "未知进程"
+        except OSError:
+            return "未知进程"
+
+    def clearChromeLocks(self):
+        for name in CHROME_LOCK_FILES:
+            path = self.profileDir / name
+            # SingletonLock在Linux下是指向不存在目标的符号链接，exists()会返回False
+            if path.is_symlink() or path.exists():
+                try:
+                    path.unlink()
+                except OSError as e:
+                    logging.warning(f"{LOG_TAG} 删除Chrome锁文件 {path} 失败: {e}")
+
+    def isCorrupted(self) -> bool:
+        for name in CHROME_JSON_FILES:
+            path = self.profileDir / name
+            if not path.exists():
+                continue
+            try:
+                json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                logging.warning(f"{LOG_TAG} 配置文件 {path} 已损坏: {e}")
+                return True
+        return False
+
+    def quarantine(self):
+        """
+        把配置文件夹移动到旁边的 <名称>.corrupt-<时间戳> 中，保留浏览器设备配置，
+        之后使用全新的配置文件夹。
+        """
+        target = self.profileDir.with_name(
+            f"{self.profileDir.name}.corrupt-{time.strftime('%Y%m%d%H%M%S')}"
+        )
+        try:
+            self.profileDir.rename(target)
+        except OSError as e:
+            logging.error(f"{LOG_TAG} 隔离配置文件夹失败，直接删除: {e}")
+            shutil.rmtree(self.profileDir, ignore_errors=True)
+            self.profileDir.mkdir(parents=True, exist_ok=True)
+            return
+        logging.warning(f"{LOG_TAG} 已隔离损坏的配置文件夹: {target}")
+        self.profileDir.mkdir(parents=True, exist_ok=True)
+        browserConfig = target / BROWSER_CONFIG_FILE
+        if browserConfig.exists():
+            shutil.copy2(browserConfig, self.profileDir / BROWSER_CONFIG_FILE)
+        quarantined = sorted(self.profileDir.parent.glob(f"{self.profileDir.name}.corrupt-*"))
+        for old in quarantined[:-MAX_QUARANTINED]:
+            shutil.rmtree(old, ignore_errors=True)
@@ -1,20 +1,22 @@
 import contextlib
 import logging
 import random
-import time
 import urllib.parse
 
 from selenium.webdriver.common.by import By
 
+from src import tracing
 from src.browser import Browser
+from src.checkpoint import CheckpointJournal
 
 from .constants import BASE_URL
 
 
 class PunchCards:
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, journal: CheckpointJournal = None):
         self.browser = browser
         self.webdriver = browser.webdriver
+        self.journal = journal
 
     def completePunchCard(self, url: str, childPromotions: dict):
         try:
@@ -43,20 +45,24 @@ class PunchCards:
                             By.XPATH,
                             f'//*[@id="QuestionPane{question}"]/div[1]/div[2]/a[{random.randint(1, 3)}]/div',
                         ).click()
-                        time.sleep(5)
+                        tracing.sleep(5)
                         self.webdriver.find_element(
                             By.XPATH,
                             f'//*[@id="AnswerPane{question}"]/div[1]/div[2]/div[4]/a/div/span/input',
                         ).click()
-                        time.sleep(3)
-                    time.sleep(5)
+                        tracing.sleep(3)
+                    tracing.sleep(5)
                     self.browser.utils.closeCurrentTab()
 
     def completePunchCards(self):
         logging.info("[PUNCH CARDS] " + "Trying to complete the Punch Cards...")
         self.completePromotionalItems()
-        punchCards = self.browser.utils.getDashboardData()["punchCards"]
+        punchCards = self.browser.utils.queryDashboard(["punchCards"])["punchCards"]
         for punchCard in punchCards:
+            offerId = (punchCard.get("parentPromotion") or {}).get("offerId")
+            if self.journal is not None and self.journal.isActivityDone(offerId):
+                logging.info(f"[PUNCH CARDS] {offerId} 已在断点日志中完成，跳过")
+                continue
             try:
                 if (
                     punchCard["parentPromotion"]
@@ -68,20 +74,30 @@ class PunchCards:
                         punchCard["parentPromotion"]["attributes"]["destination"],
                         punchCard["childPromotions"],
                     )
+                    self.browser.utils.invalidateDashboard()
+                    # dashboard中显示打卡活动已完成时才写入断点日志
+                    if self.journal is not None:
+                        if self.browser.utils.isOfferComplete(offerId):
+                            self.journal.markActivityDone(offerId)
+                        else:
+                            logging.warning(f"[PUNCH CARDS] {offerId} 执行后仍未完成，不写入断点日志")
             except Exception:  # pylint: disable=broad-except
                 self.browser.utils.resetTabs()
         logging.info("[PUNCH CARDS] Completed the Punch Cards successfully !")
-        time.sleep(2)
+        tracing.sleep(2)
         try:
             self.webdriver.get(BASE_URL)
         except Exception:  # pylint: disable=broad-except
             logging.error(f"Failed to load the page {BASE_URL}")
             self.browser.refresh()
-        time.sleep(2)
+        tracing.sleep(2)
 
     def completePromotionalItems(self):
+        # 需要在rewards页面上点击推广活动，缓存的dashboard数据不会跳转页面；
+        # 会话失效时抛出GoHomeError，不被下面的suppress吞掉
+        self.browser.utils.ensureHome(strict=False)
         with contextlib.suppress(Exception):
-            item = self.browser.utils.getDashboardData()["promotionalItem"]
+            item = self.browser.utils.queryDashboard(["promotionalItem"])["promotionalItem"]
             destUrl = urllib.parse.urlparse(item["destinationUrl"])
             baseUrl = urllib.parse.urlparse(BASE_URL)
             if (
@@ -99,3 +115,4 @@ class PunchCards:
                     By.XPATH, '//*[@id="promo-item"]/section/div/div/div/span'
                 ).click()
                 self.browser.utils.visitNewTab(8)
+                self.browser.utils.invalidateDashboard()
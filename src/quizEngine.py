@@ -0,0 +1,185 @@
+import json
+import logging
+from typing import Optional
+
+from selenium.webdriver.common.by import By
+
+from src import waits
+from src.browser import Browser
+from src.utils import PROBE_JS, probeSpec
+
+LOG_TAG = "[CMY][QUIZ]"
+
+# 一次读取rewardsQuizRenderInfo中的答题状态、所有选项的属性和二选一活动的答案编码密钥，
+# 选项属性复用Utils.probe的probe函数读取
+QUIZ_STATE_SCRIPT = PROBE_JS + """
+const info = (window._w && _w.rewardsQuizRenderInfo) || null;
+if (!info) return null;
+const specs = [];
+for (let i = 0; i < (info.numberOfOptions || 0); i++) {
+    specs.push({
+        by: "id", selector: "rqAnswerOption" + i, attributes: arguments[0],
+        text: false, click: false, all: false,
+    });
+}
+return {
+    maxQuestions: info.maxQuestions,
+    numberOfOptions: info.numberOfOptions,
+    correctAnswer: info.correctAnswer,
+    currentQuestionNumber: info.currentQuestionNumber,
+    complete: !!document.getElementById("quizCompleteContainer"),
+    options: probe(specs),
+    answerKey: (window._G && _G.IG) || null,
+};
+"""
+
+# 选项需要读取的属性
+OPTION_ATTRIBUTES = ["iscorrectoption", "data-option"]
+
+# 进入下一题或答题结束
+ADVANCE_CONDITION = (
+    "_w.rewardsQuizRenderInfo.currentQuestionNumber > {question}"
+    " || !!document.getElementById('quizCompleteContainer')"
+)
+
+# 积分文本发生变化，说明页面已经记录了上一次选对的选项
+CREDITS_CHANGED_CONDITION = (
+    "(document.getElementsByClassName('rqECredits')[0] || {{}}).innerText !== {credits}"
+)
+
+# 等待进入下一题的最长时间（秒）
+ADVANCE_TIMEOUT = 15
+# 8选项的题目每选对一个选项后等待积分刷新的最长时间（秒）
+OPTION_REFRESH_TIMEOUT = 5
+
+
+class QuizEngine:
+    """
+    答题活动的执行器。
+
+    每道题通过一次execute_script读取rewardsQuizRenderInfo和所有选项的属性，在本地计算答案后点击，
+    然后等待进入下一题，不再在每次点击后固定等待。
+    """
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        self.webdriver = browser.webdriver
+
+    @staticmethod
+    def optionId(index: int) -> str:
+        return f"rqAnswerOption{index}"
+
+    def chooseAnswers(self, state: dict, thisOrThat: bool = False) -> list:
+        """
+        根据答题状态计算需要点击的选项id。
+
+        Args:
+            state (dict): readState返回的答题状态。
+            thisOrThat (bool): 是否为二选一活动，二选一活动的correctAnswer是经过编码的答案。
+        """
+        options = list(enumerate(state["options"] or []))
+        if thisOrThat:
+            return [
+                self.optionId(i)
+                for i, option in options
+                if self.answerCode(state, option) == state["correctAnswer"]
+            ][:1]
+        if state["numberOfOptions"] == 8:
+            return [
+                self.optionId(i)
+                for i, option in options
+                if option and (option["attributes"]["iscorrectoption"] or "").lower() == "true"
+            ]
+        return [
+            self.optionId(i)
+            for i, option in options
+            if option and option["attributes"]["data-option"] == state["correctAnswer"]
+        ][:1]
+
+    def answerCode(self, state: dict, option: Optional[dict]) -> Optional[str]:
+        """二选一活动中选项的答案编码，选项或编码密钥不存在时为None。"""
+        title = option["attributes"]["data-option"] if option else None
+        if title is None or not state["answerKey"]:
+            return None
+        return self.browser.utils.getAnswerCode(state["answerKey"], title)
+
+    def readState(self) -> Optional[dict]:
+        try:
+            return self.webdriver.execute_script(QUIZ_STATE_SCRIPT, OPTION_ATTRIBUTES)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"{LOG_TAG} 读取答题状态失败: {e}")
+            return None
+
+    def start(self) -> bool:
+        if not self.browser.utils.waitUntilQuizLoads():
+            return False
+        self.webdriver.find_element(By.XPATH, '//*[@id="rqStartQuiz"]').click()
+        return waits.waitForElement(
+            self.webdriver,
+            By.XPATH,
+            '//*[@id="currentQuestionContainer"]/div/div[1]',
+            10,
+            visible=True,
+        )
+
+    def click(self, optionId: str) -> Optional[str]:
+        """点击选项，返回点击前的积分文本，在同一次调用中读取。"""
+        credits, _ = self.browser.utils.probe(
+            [
+                probeSpec(By.CLASS_NAME, "rqECredits", text=True),
+                probeSpec(By.ID, optionId, click=True),
+            ]
+        )
+        return credits["text"] if credits else None
+
+    def waitForCredits(self, credits: Optional[str]) -> bool:
+        return waits.waitForCondition(
+            self.webdriver,
+            CREDITS_CHANGED_CONDITION.format(credits=json.dumps(credits)),
+            OPTION_REFRESH_TIMEOUT,
+        )
+
+    def waitForAdvance(self, questionNumber: int) -> bool:
+        return waits.waitForCondition(
+            self.webdriver,
+            ADVANCE_CONDITION.format(question=int(questionNumber or 0)),
+            ADVANCE_TIMEOUT,
+        )
+
+    def run(self, thisOrThat: bool = False) -> bool:
+        """
+        完成答题。
+
+        Returns:
+            bool: 答题正常结束返回True，页面状态异常时返回False，由调用方重置标签页。
+        """
+        if not self.start():
+            logging.warning(f"{LOG_TAG} 答题页面未加载")
+            return False
+        state = self.readState()
+        if state is None:
+            return False
+        # 最多答maxQuestions道题，防止状态异常时死循环
+        for _ in range(state["maxQuestions"] or 0):
+            if state["complete"]:
+                break
+            answers = self.chooseAnswers(state, thisOrThat)
+            if not answers:
+                logging.warning(
+                    f"{LOG_TAG} 第{state['currentQuestionNumber']}题未找到答案，选项: {state.get('options')}"
+                )
+                return False
+            for index, answer in enumerate(answers):
+                credits = self.click(answer)
+                if index + 1 < len(answers):
+                    # 8选项的题目需要选出所有正确选项，每次点击后等待积分文本变化，确认页面已记录这次点击
+                    if not self.waitForCredits(credits):
+                        logging.warning(f"{LOG_TAG} 选择{answer}后积分未刷新")
+            if not self.waitForAdvance(state["currentQuestionNumber"]):
+                logging.warning(f"{LOG_TAG} 第{state['currentQuestionNumber']}题提交后未进入下一题")
+                return False
+            state = self.readState()
+            if state is None:
+                # 最后一题提交后页面可能已经跳转
+                break
+        return True
@@ -0,0 +1,127 @@
+import contextlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional
+
+from src import tracing
+
+LOG_TAG = "[CMY][SCHEDULER]"
+
+# 每个线程当前所属的调度器，未被调度器管理的线程为None
+_local = threading.local()
+
+
+class CooperativeScheduler:
+    """
+    单进程协作式调度器。
+
+    每个账号在各自的线程中执行，但同一时刻只有持有"执行权"的线程在做实际工作。
+    账号在空闲等待（搜索暂停、App阅读间隔等）时通过idleWait让出执行权，
+    其他账号即可利用这段时间继续执行，从而用一个进程驱动多个账号的浏览器。
+    """
+
+    def __init__(self, maxActiveAccounts: int = 3):
+        self.maxActiveAccounts = max(1, int(maxActiveAccounts))
+        # 执行权，只有持有者可以操作浏览器
+        self._baton = threading.Lock()
+
+    def run(self, accounts: list, job: Callable[[Any], Any]) -> list:
+        """
+        执行所有账号，按完成顺序返回每个账号的结果。
+
+        Args:
+            accounts (list): 账号列表。
+            job (Callable): 执行单个账号的函数，参数为账号，返回执行结果。
+
+        Returns:
+            list: 按完成顺序排列的执行结果。
+        """
+        results = []
+        # 线程池大小即同时打开浏览器的账号数，内存占用约为每个活跃账号一个浏览器
+        with ThreadPoolExecutor(
+            max_workers=self.maxActiveAccounts, thread_name_prefix="account"
+        ) as executor:
+            futures = [executor.submit(self.bind(job), account) for account in accounts]
+            for future in as_completed(futures):
+                result = future.result()
+                logging.info(f"{LOG_TAG} 账号执行完成: {result}")
+                if result:
+                    results.append(result)
+        return results
+
+    def bind(self, func: Callable) -> Callable:
+        """将函数包装为在本调度器下执行：开始前获取执行权，结束后释放。"""
+
+        def wrapper(*args, **kwargs):
+            previous = getattr(_local, "scheduler", None)
+            _local.scheduler = self
+            self._baton.acquire()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._baton.release()
+                _local.scheduler = previous
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def idle(self):
+        """在with块内让出执行权，退出时重新获取。"""
+        self._baton.release()
+        try:
+            yield
+        finally:
+            self._baton.acquire()
+
+
+def currentScheduler() -> Optional[CooperativeScheduler]:
+    return getattr(_local, "scheduler", None)
+
+
+def bindToCurrentScheduler(func: Callable) -> Callable:
+    """
+    让子线程继承当前线程所属的调度器，不在调度器中时原样返回。
+    用于账号内部再创建的线程（例如桌面端和移动端同时搜索）。
+    """
+    scheduler = currentScheduler()
+    if scheduler is None:
+        return func
+    return scheduler.bind(func)
+
+
+def idleWait(seconds: float):
+    """
+    空闲等待。在协作式调度器中会让出执行权，否则等同于time.sleep。
+    """
+    start = time.perf_counter()
+    scheduler = currentScheduler()
+    if scheduler is None:
+        time.sleep(seconds)
+    else:
+        with scheduler.idle():
+            time.sleep(seconds)
+    # 等待执行权的时间同样属于空闲时间
+    tracing.recordSleep(start, time.perf_counter() - start)
+
+
+def idleJoin(thread: threading.Thread):
+    """等待线程结束，等待期间让出执行权，避免子线程拿不到执行权而死锁。"""
+    scheduler = currentScheduler()
+    if scheduler is None:
+        thread.join()
+        return
+    with scheduler.idle():
+        thread.join()
+
+
+@contextlib.contextmanager
+def idling():
+    """在with块内让出执行权，不在调度器中时什么也不做。"""
+    scheduler = currentScheduler()
+    if scheduler is None:
+        yield
+        return
+    with scheduler.idle():
+        yield
@@ -0,0 +1,136 @@
+import abc
+import logging
+import random
+
+import requests
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from src import httpClient, tracing
+from src.browser import Browser
+
+LOG_TAG = "[CMY][SEARCH]"
+
+BACKEND_BROWSER = "browser"
+BACKEND_HTTP = "http"
+
+SEARCH_HOST = "cn.bing.com"
+SEARCH_PATH = "/search"
+SEARCH_URL = f"https://{SEARCH_HOST}{SEARCH_PATH}"
+# 最大重试次数
+MAX_RETRIES = 3
+
+
+class SearchBackend(abc.ABC):
+    """执行一次搜索的方式，submit只负责提交搜索，不等待积分到账。"""
+
+    name = ""
+
+    def __init__(self, browser: Browser, mobile: bool):
+        self.browser = browser
+        self.mobile = mobile
+
+    @abc.abstractmethod
+    def submit(self, word: str) -> bool:
+        """提交搜索，成功返回True。"""
+
+
+class BrowserSearchBackend(SearchBackend):
+    """在浏览器中打开Bing，在搜索框中输入搜索词并提交，浏览器需要已经是对应的身份。"""
+
+    name = BACKEND_BROWSER
+
+    def submit(self, word: str) -> bool:
+        webdriver = self.browser.webdriver
+        max_retries = MAX_RETRIES  # 设置最大重试次数
+        retries = 0
+        while retries < max_retries:
+            try:
+                # logging.info(f"[BING] 第{retries+1}次搜索，搜索词为:[{word}]")
+                webdriver.get("https://bing.com")
+                # 等待搜索框元素可见
+                searchbar = WebDriverWait(webdriver, 40).until(
+                    EC.visibility_of_element_located((By.ID, "sb_form_q"))
+                )
+                searchbar.send_keys(word)
+                tracing.sleep(random.randint(3, 5))
+                searchbar.submit()
+                return True
+            except TimeoutException as e:
+                retries += 1
+                logging.error(f"[BING][TimeoutException] Timeout, retrying {retries}/{max_retries} in 5 seconds...\n Error Message: {str(e)}")
+                webdriver.refresh()
+                tracing.sleep(30)
+            except Exception as e:  # 捕获其他异常
+                retries += 1
+                logging.error(f"[BING][Exception] An unexpected error occurred: {str(e)}, retrying {retries}/{max_retries} in 5 seconds...")
+                webdriver.refresh()
+                tracing.sleep(30)
+        logging.error(f"[BING] Failed after {max_retries} retries.")
+        return False
+
+
+class HttpSearchBackend(SearchBackend):
+    """
+    不打开页面，带着浏览器中的登录Cookie直接请求搜索结果页。
+
+    User-Agent和Client Hints使用Browser为对应身份生成的配置，与浏览器中的请求一致，
+    移动端搜索不需要把浏览器切换为移动端身份，也不需要单独的移动端浏览器。
+    """
+
+    name = BACKEND_HTTP
+
+    def headers(self) -> dict:
+        identity = self.browser.getIdentity(self.mobile)
+        metadata = identity["userAgentMetadata"]
+        brands = ", ".join(
+            f'"{brand["brand"]}";v="{brand["version"]}"' for brand in metadata["brands"]
+        )
+        lang = self.browser.localeLang
+        return {
+            "User-Agent": identity["userAgent"],
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": f"{lang}-{self.browser.localeGeo},{lang};q=0.9",
+            "Referer": f"https://{SEARCH_HOST}/",
+            "Sec-CH-UA": brands,
+            "Sec-CH-UA-Mobile": "?1" if self.mobile else "?0",
+            "Sec-CH-UA-Platform": f'"{metadata["platform"]}"',
+            "Sec-Fetch-Dest": "document",
+            "Sec-Fetch-Mode": "navigate",
+            "Sec-Fetch-Site": "same-origin",
+            "Upgrade-Insecure-Requests": "1",
+        }
+
+    def submit(self, word: str) -> bool:
+        for retries in range(1, MAX_RETRIES + 1):
+            try:
+                response = httpClient.get(
+                    SEARCH_URL,
+                    params={"q": word, "form": "QBLH"},
+                    headers=self.headers(),
+                    cookies=self.browser.utils.cookieBridge.cookiesFor(SEARCH_HOST, SEARCH_PATH),
+                )
+                if response.status_code == requests.codes.ok:
+                    return True
+                logging.warning(
+                    f"{LOG_TAG} 搜索请求返回状态码 {response.status_code}，重试 {retries}/{MAX_RETRIES}"
+                )
+            except requests.RequestException as e:
+                logging.warning(f"{LOG_TAG} 搜索请求失败: {e}，重试 {retries}/{MAX_RETRIES}")
+            # 登录状态可能已经变化，重试前重新同步Cookie
+            self.browser.utils.cookieBridge.markStale()
+            tracing.sleep(random.randint(3, 5))
+        logging.error(f"[BING] Failed after {MAX_RETRIES} retries.")
+        return False
+
+
+def createSearchBackend(browser: Browser, mobile: bool) -> SearchBackend:
+    """按配置项search_backend创建搜索方式，默认在浏览器中搜索。"""
+    name = browser.config.get("search_backend", BACKEND_BROWSER)
+    if name == BACKEND_HTTP:
+        return HttpSearchBackend(browser, mobile)
+    if name != BACKEND_BROWSER:
+        logging.warning(f"{LOG_TAG} 未知的search_backend: {name}，使用浏览器搜索")
+    return BrowserSearchBackend(browser, mobile)
@@ -0,0 +1,98 @@
+import logging
+from typing import Optional
+
+LOG_TAG = "[CMY][PROGRESS]"
+
+# 目前每次搜索获得的积分
+SEARCH_POINTS = 3
+# 默认每隔多少次搜索用仪表盘数据校准一次
+RECONCILE_INTERVAL = 12
+# 估计还有剩余次数时，连续多少次搜索积分没有变化就提前校准
+MAX_UNCREDITED_STREAK = 2
+
+
+class SearchProgress:
+    """
+    搜索进度跟踪。
+
+    根据每次搜索前后的积分变化估计剩余搜索次数，只在每隔reconcileInterval次搜索、
+    积分变化与估计不一致或估计已经搜索完成时，才通过getRemainingSearches读取仪表盘校准。
+    """
+
+    def __init__(
+        self,
+        utils,
+        mobile: bool,
+        remaining: int,
+        reconcileInterval: int = RECONCILE_INTERVAL,
+    ):
+        self.utils = utils
+        self.mobile = mobile
+        self.remaining = remaining
+        self.reconcileInterval = reconcileInterval
+        self.balance: Optional[int] = None
+        self._sinceReconcile = 0
+        self._uncreditedStreak = 0
+        self._mismatch = False
+        self.reconciles = 0
+
+    def start(self) -> Optional[int]:
+        """读取搜索前的积分作为基准，读取失败时返回None，第一次搜索的积分变化无法判断。"""
+        balance = self.utils.getBingAccountPoints()
+        self.balance = balance or None
+        return self.balance
+
+    def recordSearch(self, balance: int) -> Optional[bool]:
+        """
+        记录一次搜索后的积分。
+
+        Returns:
+            Optional[bool]: 这次搜索是否获得了积分，积分读取失败或没有基准时返回None。
+        """
+        self._sinceReconcile += 1
+        if not balance:
+            self._mismatch = True
+            return None
+        previous, self.balance = self.balance, balance
+        if previous is None:
+            self._mismatch = True
+            return None
+        delta = balance - previous
+        if delta <= 0:
+            self._uncreditedStreak += 1
+            if self.remaining > 0 and self._uncreditedStreak >= MAX_UNCREDITED_STREAK:
+                self._mismatch = True
+            return False
+        self._uncreditedStreak = 0
+        # 积分可能延迟到账，一次变化可能对应多次搜索；不是整数倍时说明有其他来源的积分
+        credited, extra = divmod(delta, SEARCH_POINTS)
+        if extra or credited > self.remaining:
+            self._mismatch = True
+        self.remaining = max(0, self.remaining - max(credited, 1))
+        return True
+
+    def needsReconcile(self) -> bool:
+        return (
+            self._mismatch
+            or self.remaining <= 0
+            or self._sinceReconcile >= self.reconcileInterval
+        )
+
+    def reconcile(self) -> int:
+        """用仪表盘中的搜索进度校准剩余次数。"""
+        remainingDesktop, remainingMobile = self.utils.getRemainingSearches()
+        remaining = remainingMobile if self.mobile else remainingDesktop
+        if remaining != self.remaining:
+            logging.info(f"{LOG_TAG} 估计剩余搜索次数 {self.remaining}，仪表盘中为 {remaining}")
+        self.remaining = remaining
+        self._sinceReconcile = 0
+        self._uncreditedStreak = 0
+        self._mismatch = False
+        self.reconciles += 1
+        return remaining
+
+    def check(self) -> int:
+        """返回剩余搜索次数，需要时先校准。"""
+        if self.needsReconcile():
+            return self.reconcile()
+        return self.remaining
@@ -0,0 +1,164 @@
+import logging
+import random
+import time
+from typing import Optional
+
+from src.browser import Browser
+from src.notifier import Notifier
+from src.scheduler import idleWait
+from src.searchBackend import BACKEND_BROWSER
+from src.searchProgress import RECONCILE_INTERVAL, SearchProgress
+from src.searches import INTERVAL_NUMBER, PAUSE_TIME, Searches
+
+LOG_TAG = "[CMY][INTERLEAVE]"
+
+# 每种搜索的最大搜索次数
+MAX_SEARCHES = 50
+# 连续失败多少次后停止该种搜索
+MAX_CONSECUTIVE_FAILURES = 8
+
+
+class SearchQueue:
+    """一种搜索（桌面端或移动端）的剩余次数、冷却时间和失败计数。"""
+
+    def __init__(self, mobile: bool, progress: SearchProgress):
+        self.mobile = mobile
+        self.name = "Mobile" if mobile else "Desktop"
+        self.progress = progress
+        self.searches = 0
+        self.consecutiveFailures = 0
+        self.cooldownUntil = 0.0
+        self.done = progress.remaining <= 0
+
+    def isReady(self, now: float) -> bool:
+        return not self.done and self.cooldownUntil <= now
+
+
+class InterleavedSearches:
+    """
+    在同一个浏览器中交替执行桌面端和移动端搜索。
+
+    两种搜索各自每INTERVAL_NUMBER次搜索后冷却PAUSE_TIME分钟，一种搜索冷却期间切换身份执行另一种搜索，
+    只有两种搜索都在冷却时才空闲等待，总耗时接近两种搜索中耗时较长的一种，而不是两者之和。
+    """
+
+    def __init__(self, browser: Browser):
+        self.browser = browser
+        # 每种身份各自的搜索方式，通过HTTP搜索时不需要切换浏览器的身份
+        self.searches = {mobile: Searches(browser, mobile) for mobile in (False, True)}
+        self.terms: list = []
+        self.balance: Optional[int] = None
+
+    def createQueue(self, mobile: bool, remaining: int) -> SearchQueue:
+        progress = SearchProgress(
+            self.browser.utils,
+            mobile,
+            remaining,
+            self.browser.config.get("search_reconcile_interval", RECONCILE_INTERVAL),
+        )
+        return SearchQueue(mobile, progress)
+
+    def nextTerm(self, account: str, needed: int) -> str:
+        if not self.terms:
+            self.terms = self.searches[False].getHotSearch(max(needed, 1), account)
+        return self.terms.pop(0)
+
+    def nextQueue(self, queues: list) -> Optional[SearchQueue]:
+        """剩余次数最多的可执行队列，都在冷却时等待最早结束冷却的队列，全部完成时返回None。"""
+        pending = [queue for queue in queues if not queue.done]
+        if not pending:
+            return None
+        now = time.monotonic()
+        ready = [queue for queue in pending if queue.isReady(now)]
+        if not ready:
+            queue = min(pending, key=lambda queue: queue.cooldownUntil)
+            logging.info(f"{LOG_TAG} 桌面端和移动端搜索都在冷却中，等待{int(queue.cooldownUntil - now)}秒")
+            idleWait(queue.cooldownUntil - now)
+            return queue
+        # 剩余次数相同时当前身份的队列优先，减少切换身份的次数
+        return max(
+            ready,
+            key=lambda queue: (queue.progress.remaining, queue.mobile == self.browser.mobile),
+        )
+
+    def searchOnce(self, account: str, queue: SearchQueue):
+        searches = self.searches[queue.mobile]
+        if searches.backend.name == BACKEND_BROWSER:
+            self.browser.switchIdentity(queue.mobile)
+        word = self.nextTerm(account, queue.progress.remaining)
+        try:
+            points = searches.bingSearch(word)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(f"{LOG_TAG} 执行单次搜索时发生错误: {str(e)}")
+            points = 0
+        idleWait(random.randint(15, 30))  # 随机等待20-30秒
+        queue.searches += 1
+
+        # 两种搜索共用同一个积分，以上一次搜索后的积分为基准判断这次搜索是否获得积分
+        queue.progress.balance = self.balance
+        credited = queue.progress.recordSearch(points)
+        searches.recordTerm(account, word, credited)
+        if points:
+            self.balance = points
+        if credited:
+            logging.info(f"[BING][{queue.name}] 第{queue.searches}次搜索 SUCCESS，搜索词:[{word}] 搜索后积分:{points}")
+            queue.consecutiveFailures = 0
+        else:
+            logging.info(f"[BING][{queue.name}] 第{queue.searches}次搜索 FAIL，搜索词:[{word}]")
+            queue.consecutiveFailures += 1
+            if queue.consecutiveFailures >= MAX_CONSECUTIVE_FAILURES:
+                message = f"[BING] [{account}] [{queue.name}] 连续{queue.consecutiveFailures}次搜索失败，停止搜索"
+                logging.error(message)
+                Notifier().wechat(account, message)
+                queue.done = True
+                return
+
+        if queue.searches >= MAX_SEARCHES:
+            logging.info(f"[BING] [{account}] [{queue.name}] 已达到最大搜索次数{MAX_SEARCHES}次，停止搜索")
+            queue.done = True
+            return
+        # 每隔INTERVAL_NUMBER次搜索冷却，冷却前和估计已经搜索完成时检查剩余次数
+        cooldown = queue.searches % INTERVAL_NUMBER == 0
+        if cooldown or queue.progress.remaining <= 0:
+            try:
+                remaining = queue.progress.check()
+            except Exception as e:  # pylint: disable=broad-except
+                logging.error(f"{LOG_TAG} 获取剩余搜索次数时发生错误: {str(e)}")
+                remaining = queue.progress.remaining
+            if remaining <= 0:
+                logging.info(f"[BING] [{account}] [{queue.name}] 中，剩余搜索已完成")
+                queue.done = True
+                return
+            logging.info(f"[BING] [{queue.name}]中，剩余搜索次数为:{remaining}")
+        if cooldown:
+            logging.info(f"[BING][{queue.name}] 冷却{PAUSE_TIME}分钟，期间执行另一种搜索")
+            queue.cooldownUntil = time.monotonic() + PAUSE_TIME * 60
+
+    def run(self, account: str, remainingDesktop: int, remainingMobile: int) -> int:
+        """
+        完成桌面端和移动端的剩余搜索。
+
+        Returns:
+            int: 搜索结束后的积分。
+        """
+        logging.info(
+            f"[BING] ===== Starting [{account}] interleaved Bing searches... "
+            f"桌面端剩余: {remainingDesktop}，移动端剩余: {remainingMobile} ====="
+        )
+        start = time.monotonic()
+        queues = [self.createQueue(False, remainingDesktop), self.createQueue(True, remainingMobile)]
+        self.balance = self.browser.utils.getBingAccountPoints() or None
+        # 结束后切换回原来的身份
+        with self.browser.identity(self.browser.mobile):
+            while True:
+                queue = self.nextQueue(queues)
+                if queue is None:
+                    break
+                if queue.isReady(time.monotonic()):
+                    self.searchOnce(account, queue)
+        logging.info(
+            f"[BING] ===== Finished [{account}] interleaved Bing searches ! "
+            f"桌面端 {queues[0].searches} 次，移动端 {queues[1].searches} 次，"
+            f"耗时 {int(time.monotonic() - start)} 秒 ====="
+        )
+        return self.balance or 0
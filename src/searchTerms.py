@@ -0,0 +1,180 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import requests
+
+from src import httpClient
+from src.localTerms import getLocalTermGenerator
+from src.termIndex import TermIndex
+
+LOG_TAG = "[CMY][TERMS]"
+
+HOT_WORDS_API = "https://api.gmya.net/Api/"  # 故梦热门词API接口网站
+HOT_WORDS_SOURCES = ["BaiduHot", "TouTiaoHot", "DouYinHot", "WeiBoHot"]
+# 单个来源的请求超时（秒）
+SOURCE_TIMEOUT = 10
+# 所有账号和进程共享的热门搜索词缓存
+CACHE_PATH = Path(__file__).resolve().parent.parent / "cache" / "hot_search.json"
+
+# 热门搜索词不可用时至少生成的本地搜索词数量
+LOCAL_TERMS_COUNT = 60
+# 本地搜索词被使用记录过滤后不够时最多重新生成的轮数
+LOCAL_TERMS_ROUNDS = 5
+
+
+def fetchSource(source: str) -> list:
+    url = HOT_WORDS_API + source
+    try:
+        response = httpClient.get(url, timeout=SOURCE_TIMEOUT)
+        if response.status_code == 200:
+            data = response.json()
+            if data["code"] == 200:
+                # 获取data中所有的title值
+                return [item["title"] for item in data["data"]]
+    except requests.RequestException as e:
+        logging.error(f"{LOG_TAG} 请求 {url} 失败: {str(e)}")
+    except json.JSONDecodeError as e:
+        logging.error(f"{LOG_TAG} 解析JSON数据失败: {str(e)}")
+    except KeyError as e:
+        logging.error(f"{LOG_TAG} 数据中缺少键: {str(e)}")
+    except Exception as e:  # pylint: disable=broad-except
+        logging.error(f"{LOG_TAG} 发生未知错误: {str(e)}")
+    return []
+
+
+def fetchAllSources() -> list:
+    """同时请求所有来源，合并并去重，各来源的搜索词交替排列。"""
+    with ThreadPoolExecutor(
+        max_workers=len(HOT_WORDS_SOURCES), thread_name_prefix="hot-search"
+    ) as executor:
+        results = list(executor.map(fetchSource, HOT_WORDS_SOURCES))
+    terms = []
+    seen = set()
+    for index in range(max((len(result) for result in results), default=0)):
+        for result in results:
+            if index < len(result):
+                term = result[index].strip()
+                if term and term not in seen:
+                    seen.add(term)
+                    terms.append(term)
+    return terms
+
+
+class TermProvider:
+    """
+    热门搜索词提供者。
+
+    热门搜索词保存在 cache/hot_search.json 中，所有账号和进程共享，超过ttl秒后在后台线程中刷新。
+    getTerms从不等待网络请求：缓存可用时返回缓存（即使已过期），数量不够或没有缓存时用本地生成的搜索词补足。
+    """
+
+    def __init__(self, ttl: float = 3600, cachePath: Path = CACHE_PATH):
+        self.ttl = ttl
+        self.cachePath = cachePath
+        self._lock = threading.Lock()
+        self._refreshThread: Optional[threading.Thread] = None
+        self._terms: list = []
+        self._fetchedAt = 0.0
+
+    def _loadCache(self):
+        try:
+            cache = json.loads(self.cachePath.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if cache.get("fetchedAt", 0) > self._fetchedAt and cache.get("terms"):
+            self._terms = cache["terms"]
+            self._fetchedAt = cache["fetchedAt"]
+
+    def _saveCache(self):
+        try:
+            self.cachePath.parent.mkdir(parents=True, exist_ok=True)
+            tmpPath = self.cachePath.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmpPath.write_text(
+                json.dumps({"fetchedAt": self._fetchedAt, "terms": self._terms}, ensure_ascii=False),
+                encoding="utf-8",
+            )
+            os.replace(tmpPath, self.cachePath)
+        except OSError as e:
+            logging.warning(f"{LOG_TAG} 写入热门搜索词缓存失败: {e}")
+
+    def isFresh(self) -> bool:
+        return bool(self._terms) and time.time() - self._fetchedAt < self.ttl
+
+    def refresh(self):
+        terms = fetchAllSources()
+        if not terms:
+            logging.info(f"{LOG_TAG} 所有来源都获取失败，继续使用之前的搜索词")
+            return
+        with self._lock:
+            self._terms = terms
+            self._fetchedAt = time.time()
+            self._saveCache()
+        logging.info(f"{LOG_TAG} 获取热门搜索词成功，共 {len(terms)} 个")
+
+    def prefetch(self):
+        """缓存过期时在后台线程中刷新，已经在刷新时不重复启动。"""
+        with self._lock:
+            # 其他进程可能已经刷新了缓存
+            self._loadCache()
+            if self.isFresh():
+                return
+            if self._refreshThread is not None and self._refreshThread.is_alive():
+                return
+            self._refreshThread = threading.Thread(
+                target=self.refresh, name="hot-search-refresh", daemon=True
+            )
+            self._refreshThread.start()
+
+    def getTerms(
+        self, minimum: int = 0, account: Optional[str] = None, termIndex: Optional[TermIndex] = None
+    ) -> list:
+        """
+        返回打乱顺序的搜索词列表，不等待网络请求。
+
+        Args:
+            minimum (int): 至少返回的搜索词数量，热门搜索词不够时用本地生成的搜索词补足。
+            account (str): 使用搜索词的账号，与termIndex一起指定时去掉该账号最近用过的搜索词。
+            termIndex (TermIndex): 搜索词使用记录。
+        """
+        self.prefetch()
+        with self._lock:
+            terms = list(self._terms)
+        if not terms:
+            logging.info(f"{LOG_TAG} 热门搜索词尚未获取到，使用本地生成的搜索词！")
+            minimum = max(minimum, LOCAL_TERMS_COUNT)
+        checkUsed = account is not None and termIndex is not None
+        if checkUsed:
+            total = len(terms)
+            terms = termIndex.filterFresh(account, terms)
+            if len(terms) < total:
+                logging.info(f"{LOG_TAG} 去掉最近已经用过的搜索词 {total - len(terms)} 个")
+        random.shuffle(terms)
+        generator = getLocalTermGenerator()
+        # 生成的搜索词也可能在之前的运行中用过，过滤后不够时继续生成
+        for _ in range(LOCAL_TERMS_ROUNDS):
+            if len(terms) >= minimum:
+                break
+            generated = generator.generate(minimum - len(terms), exclude=terms)
+            if not generated:
+                break
+            terms += termIndex.filterFresh(account, generated) if checkUsed else generated
+        return terms
+
+_provider: Optional[TermProvider] = None
+_providerLock = threading.Lock()
+
+
+def getTermProvider(ttl: Optional[float] = None) -> TermProvider:
+    """进程内共享的TermProvider，ttl只在第一次调用时生效。"""
+    global _provider
+    with _providerLock:
+        if _provider is None:
+            _provider = TermProvider(ttl if ttl is not None else 3600)
+        return _provider
@@ -1,75 +1,48 @@
-import json
 import logging
 import random
-import time
 from datetime import date, timedelta
+from typing import Optional
 
-import requests
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-
+from src import tracing
 from src.browser import Browser
+from src.creditVerifier import CreditVerifier
 from src.notifier import Notifier  # 添加Notifier导入
+from src.scheduler import idleWait
+from src.searchBackend import createSearchBackend
+from src.searchProgress import RECONCILE_INTERVAL, SearchProgress
+from src.searchTerms import getTermProvider
+from src.termIndex import getTermIndex
 
 LOG_TAG = "[CMY]"
 PAUSE_TIME = 10  # 每隔4次搜索的暂停时间，单位为 分钟
 INTERVAL_NUMBER = 4  # 每隔多少次搜索暂停一次
 
 class Searches:
-    def __init__(self, browser: Browser):
+    def __init__(self, browser: Browser, mobile: Optional[bool] = None):
         self.browser = browser
         self.webdriver = browser.webdriver
-
-    def getHotSearch(self):
-        # 默认搜索词，热门搜索词请求失败时使用
-        default_search_words = ["盛年不重来，一日难再晨", "千里之行，始于足下", "少年易学老难成，一寸光阴不可轻", "敏而好学，不耻下问", "海内存知已，天涯若比邻", "三人行，必有我师焉",
-            "莫愁前路无知已，天下谁人不识君", "人生贵相知，何用金与钱", "天生我材必有用", "海纳百川有容乃大；壁立千仞无欲则刚", "穷则独善其身，达则兼济天下", "读书破万卷，下笔如有神",
-            "学而不思则罔，思而不学则殆", "一年之计在于春，一日之计在于晨", "莫等闲，白了少年头，空悲切", "少壮不努力，老大徒伤悲", "一寸光阴一寸金，寸金难买寸光阴", "近朱者赤，近墨者黑",
-            "吾生也有涯，而知无涯", "纸上得来终觉浅，绝知此事要躬行", "学无止境", "己所不欲，勿施于人", "天将降大任于斯人也", "鞠躬尽瘁，死 afterwards.", "书到用时方恨少", "天下兴亡，匹夫有责",
-            "人无远慮，必有近憂", "为中华之崛起而读书", "一日无书，百事荒废", "岂能尽如人意，但求无愧我心", "人生自古谁无死，留取丹心照汗青", "吾生也有涯，而知无涯", "生于忧患，死于安乐",
-            "言必信，行必果", "读书破万卷，下笔如有神", "夫君子之行，静以修身，俭以养德", "老骥伏枥，志在千里", "一日不读书，胸臆无佳想", "王侯将相宁有种乎", "淡泊以明志。宁静而致远,", "卧龙跃马终黄土"]
-        Hot_words_apis = "https://api.gmya.net/Api/" # 故梦热门词API接口网站
-        keywords_source = ['BaiduHot', 'TouTiaoHot', 'DouYinHot', 'WeiBoHot']
-        # 打乱keywords_source列表的顺序
-        random.shuffle(keywords_source)
-        current_source_index = 0  # 当前搜索词来源的索引
-
-        while current_source_index < len(keywords_source):  # 循环遍历所有搜索词来源
-            source = keywords_source[current_source_index]  # 获取当前搜索词来源
-            url = Hot_words_apis + source  # 构造请求URL
-            try:
-                response = requests.get(url, timeout=20)  # 发送GET请求
-                if response.status_code == 200:  # 如果请求成功
-                    data = response.json()  # 解析JSON数据
-                    if data['code'] == 200:  # 如果数据获取成功
-                        # 获取data中所有的title值，并存入一个列表中
-                        search_words = [item['title'] for item in data['data']]
-                        # 随机打乱列表顺序
-                        random.shuffle(search_words)
-                        logging.info(f"{LOG_TAG} 获取热门搜索词成功！")
-                        return search_words  # 返回搜索词列表
-            except requests.RequestException as e:
-                logging.error(f"{LOG_TAG} 请求 {url} 失败: {str(e)}")
-            except json.JSONDecodeError as e:
-                logging.error(f"{LOG_TAG} 解析JSON数据失败: {str(e)}")
-            except KeyError as e:
-                logging.error(f"{LOG_TAG} 数据中缺少键: {str(e)}")
-            except Exception as e:
-                logging.error(f"{LOG_TAG} 发生未知错误: {str(e)}")
-                
-            current_source_index += 1 
-
-        # 如果所有搜索词来源都失败，则返回默认搜索词
-        logging.info(f"{LOG_TAG} 获取热门搜索词失败，使用默认搜索词！")
-        # 返回打乱后的default_search_words
-        random.shuffle(default_search_words)
-        return default_search_words
+        # 默认使用浏览器当前的身份，通过HTTP搜索时可以不切换浏览器身份直接进行移动端搜索
+        self.mobile = browser.mobile if mobile is None else mobile
+        self.backend = createSearchBackend(browser, self.mobile)
+        self.termIndex = (
+            getTermIndex(browser.config.get("term_reuse_days", 7))
+            if browser.config.get("enable_term_index", True)
+            else None
+        )
+
+    def getHotSearch(self, minimum: int = 0, account: Optional[str] = None):
+        # 热门搜索词由后台线程获取并缓存，这里不等待网络请求，数量不够时用本地生成的搜索词补足
+        return getTermProvider(self.browser.config.get("hot_search_cache_ttl", 3600)).getTerms(
+            minimum, account, self.termIndex
+        )
+
+    def recordTerm(self, account: str, word: str, credited: Optional[bool]):
+        if self.termIndex is not None:
+            self.termIndex.record(account, word, credited)
 
     def bingSearches(self, currentAccount: str, numberOfSearches: int, pointsCounter: int = 0):
         try:
-            DesktopOrMobile = self.browser.browserType.capitalize()
+            DesktopOrMobile = "Mobile" if self.mobile else "Desktop"
             logging.info(
                 "[BING] "
                 + f"===== Starting [{currentAccount}] [{DesktopOrMobile}] Edge Bing searches... "
@@ -77,7 +50,7 @@ class Searches:
             )
 
             try:
-                search_terms = self.getHotSearch()
+                search_terms = self.getHotSearch(numberOfSearches, currentAccount)
             except Exception as e:
                 logging.error(f"{LOG_TAG} 获取热门搜索词时发生错误: {str(e)}")
                 # 若获取失败，使用默认搜索词
@@ -86,111 +59,149 @@ class Searches:
             if len(search_terms) < numberOfSearches:
                 logging.info(f"[BING][{DesktopOrMobile}]获取到的搜索词个数小于需要搜索的个数，不满足需求!!!!!!!!!!!!!!!!!!!!!!!!")
                 try:
-                    search_terms += self.getHotSearch()
+                    search_terms += self.getHotSearch(account=currentAccount)
                 except Exception as e:
                     logging.error(f"{LOG_TAG} 补充热门搜索词时发生错误: {str(e)}")
 
             else:
                 logging.info(f"[BING][{DesktopOrMobile}]获取到的搜索词个数为:{len(search_terms)},大于等于需要搜索的个数:{numberOfSearches}，满足需求")
 
+            progress = SearchProgress(
+                self.browser.utils,
+                self.mobile,
+                numberOfSearches,
+                self.browser.config.get("search_reconcile_interval", RECONCILE_INTERVAL),
+            )
+            # 以搜索前的积分为基准，第一次搜索也能根据积分变化判断是否成功
+            pointsCounter = max(pointsCounter, progress.start() or 0)
+
+            # 流水线模式下由后台线程检查积分，浏览器不等待检查结果直接进行下一次搜索
+            verifier = (
+                CreditVerifier(self.browser.utils)
+                if self.browser.config.get("pipelined_search_verification", False)
+                else None
+            )
+
             i = 0
             consecutive_failures = 0  # 添加连续失败计数器
-            # 添加最大搜索次数50的限制条件
-            while i < 50:
-                # 每隔4次搜索暂停10分钟
-                if i != 0 and i % INTERVAL_NUMBER == 0:
-                    try:
-                        remainingSearches, remainingSearchesM = self.browser.utils.getRemainingSearches()
-                    except Exception as e:
-                        logging.error(f"{LOG_TAG} 获取剩余搜索次数时发生错误: {str(e)}")
-                        time.sleep(300)
-
-                    if (DesktopOrMobile == 'Mobile' and remainingSearchesM == 0) or (DesktopOrMobile == 'Desktop' and remainingSearches == 0):
-                        logging.info(
-                            f"[BING] [{currentAccount}] [{DesktopOrMobile}] 中，剩余搜索已完成，总积分为:{pointsCounter}"
-                        )
-                        break
-                    if DesktopOrMobile == 'Mobile':
-                        logging.info(
-                            f"[BING] [{DesktopOrMobile}]中，剩余搜索次数为:{remainingSearchesM}"
-                        )
-                    else:
-                        logging.info(
-                            f"[BING] [{DesktopOrMobile}]中，剩余搜索次数为:{remainingSearches}"
-                        )
-                    logging.info(
-                        f"[BING][{DesktopOrMobile}] 暂停{PAUSE_TIME}分钟"
-                    )
-                    time.sleep(PAUSE_TIME * 60)
-
-                # 如果search_terms列表为空，则重新获取
-                if not search_terms:
-                    logging.info(f"[BING][{DesktopOrMobile}] search_terms列表为空，重新获取")
-                    try:
-                        search_terms = self.getHotSearch()
-                    except Exception as e:
-                        logging.error(f"{LOG_TAG} 重新获取热门搜索词时发生错误: {str(e)}")
-                    time.sleep(5) # 避免请求过快，导致请求失败
-                search_word = search_terms.pop(0)  # 从列表中取出第一个元素作为搜索词
-                try:
-                    points = self.bingSearch(search_word)
-                except Exception as e:
-                    logging.error(f"{LOG_TAG} 执行单次搜索时发生错误: {str(e)}")
-                    points = 0
-                time.sleep(random.randint(15, 30))  # 随机等待20-30秒
 
-                i += 1
+            def handleResult(index: int, search_word: str, points: int) -> bool:
+                """处理第index次搜索的结果，连续失败次数过多需要停止搜索时返回True。"""
+                nonlocal pointsCounter, consecutive_failures
+                # 搜索失败（返回0）时无法判断搜索词是否获得积分
+                self.recordTerm(currentAccount, search_word, progress.recordSearch(points))
                 # 正确更新总积分
                 if points > pointsCounter:
-                    logging.info(f"[BING][{DesktopOrMobile}] 第{i}次搜索 SUCCESS，搜索词:[{search_word}] \n搜索词:[{search_word}] 搜索前积分:{pointsCounter}, 搜索后积分:{points}\n")
+                    logging.info(f"[BING][{DesktopOrMobile}] 第{index}次搜索 SUCCESS，搜索词:[{search_word}] \n搜索词:[{search_word}] 搜索前积分:{pointsCounter}, 搜索后积分:{points}\n")
                     pointsCounter = points
                     consecutive_failures = 0  # 搜索成功，重置连续失败计数器
-                else:
-                    logging.info(f"[BING][{DesktopOrMobile}] 第{i}次搜索 FAIL，搜索词:[{search_word}] \n")
-                    consecutive_failures += 1  # 搜索失败，增加连续失败计数器
-                    # 连续8次搜索失败时停止搜索
-                    if consecutive_failures >= 8:
-                        logging.error(f"[BING] [{currentAccount}] [{DesktopOrMobile}] 连续{consecutive_failures}次搜索失败，停止搜索")
-                        notifier = Notifier()
-                        notifier.wechat(currentAccount, f"[BING] [{currentAccount}] [{DesktopOrMobile}] 连续{consecutive_failures}次搜索失败，停止搜索")
+                    return False
+                logging.info(f"[BING][{DesktopOrMobile}] 第{index}次搜索 FAIL，搜索词:[{search_word}] \n")
+                consecutive_failures += 1  # 搜索失败，增加连续失败计数器
+                # 连续8次搜索失败时停止搜索
+                if consecutive_failures >= 8:
+                    logging.error(f"[BING] [{currentAccount}] [{DesktopOrMobile}] 连续{consecutive_failures}次搜索失败，停止搜索")
+                    notifier = Notifier()
+                    notifier.wechat(currentAccount, f"[BING] [{currentAccount}] [{DesktopOrMobile}] 连续{consecutive_failures}次搜索失败，停止搜索")
+                    return True
+                return False
+
+            try:
+                # 添加最大搜索次数50的限制条件
+                while i < 50:
+                    # 每隔4次搜索暂停10分钟
+                    if i != 0 and i % INTERVAL_NUMBER == 0:
+                        # 校准前先处理已经提交的搜索的检查结果，暂停前等待检查完成不会增加耗时
+                        if verifier is not None and any(
+                            [handleResult(*result) for result in verifier.drain()]
+                        ):
+                            break
+                        # 剩余次数根据每次搜索的积分变化估计，只在需要时读取仪表盘校准
+                        try:
+                            remaining = progress.check()
+                        except Exception as e:
+                            logging.error(f"{LOG_TAG} 获取剩余搜索次数时发生错误: {str(e)}")
+                            idleWait(300)
+                            remaining = progress.remaining
+
+                        if remaining == 0:
+                            logging.info(
+                                f"[BING] [{currentAccount}] [{DesktopOrMobile}] 中，剩余搜索已完成，总积分为:{pointsCounter}"
+                            )
+                            break
+                        logging.info(
+                            f"[BING] [{DesktopOrMobile}]中，剩余搜索次数为:{remaining}"
+                        )
+                        logging.info(
+                            f"[BING][{DesktopOrMobile}] 暂停{PAUSE_TIME}分钟"
+                        )
+                        idleWait(PAUSE_TIME * 60)
+
+                    # 如果search_terms列表为空，则重新获取
+                    if not search_terms:
+                        logging.info(f"[BING][{DesktopOrMobile}] search_terms列表为空，重新获取")
+                        try:
+                            search_terms = self.getHotSearch(max(numberOfSearches - i, 1), currentAccount)
+                        except Exception as e:
+                            logging.error(f"{LOG_TAG} 重新获取热门搜索词时发生错误: {str(e)}")
+                    search_word = search_terms.pop(0)  # 从列表中取出第一个元素作为搜索词
+                    i += 1
+                    if verifier is None:
+                        try:
+                            points = self.bingSearch(search_word)
+                        except Exception as e:
+                            logging.error(f"{LOG_TAG} 执行单次搜索时发生错误: {str(e)}")
+                            points = 0
+                        results = [(i, search_word, points)]
+                    else:
+                        try:
+                            submitted = self.submitSearch(search_word)
+                        except Exception as e:
+                            logging.error(f"{LOG_TAG} 执行单次搜索时发生错误: {str(e)}")
+                            submitted = False
+                        if submitted:
+                            verifier.submit(i, search_word)
+                        # 提交失败的搜索直接按失败处理，其余结果按提交顺序处理
+                        results = ([] if submitted else [(i, search_word, 0)]) + verifier.completed()
+                    idleWait(random.randint(15, 30))  # 随机等待20-30秒
+
+                    # 所有结果都要处理，保证搜索进度和搜索词记录完整
+                    if any([handleResult(*result) for result in results]):
                         break
-                # 如果已达到最大搜索次数50，输出日志
-                if i >= 50:
-                    logging.info(f"[BING] [{currentAccount}] [{DesktopOrMobile}] 已达到最大搜索次数50次，停止搜索")
+                    # 如果已达到最大搜索次数50，输出日志
+                    if i >= 50:
+                        logging.info(f"[BING] [{currentAccount}] [{DesktopOrMobile}] 已达到最大搜索次数50次，停止搜索")
+                if verifier is not None:
+                    for result in verifier.drain():
+                        handleResult(*result)
+            finally:
+                if verifier is not None:
+                    verifier.close()
 
             logging.info(
                 f"[BING] ===== Finished [{currentAccount}] [{DesktopOrMobile}] Edge Bing searches ! ====="
             )
+            logging.info(f"[BING] [{currentAccount}] [{DesktopOrMobile}] 读取仪表盘校准搜索进度 {progress.reconciles} 次")
+            if self.termIndex is not None:
+                credited, judged = self.termIndex.creditRate(currentAccount)
+                logging.info(f"[BING] [{currentAccount}] 今日搜索获得积分的次数: {credited}/{judged}")
             return pointsCounter
         except Exception as e:
             logging.error(f"{LOG_TAG} bingSearches 函数发生严重错误: {str(e)}")
             return pointsCounter
 
+    @tracing.traced("searches.bingSearch", "search")
     def bingSearch(self, word: str):
-        max_retries = 3  # 设置最大重试次数
-        retries = 0
-        while retries < max_retries:
-            try:
-                # logging.info(f"[BING] 第{retries+1}次搜索，搜索词为:[{word}]")
-                self.webdriver.get("https://bing.com")
-                # 等待搜索框元素可见
-                searchbar = WebDriverWait(self.webdriver, 40).until(
-                    EC.visibility_of_element_located((By.ID, "sb_form_q"))
-                )
-                searchbar.send_keys(word)
-                time.sleep(random.randint(3, 5))
-                searchbar.submit()
-                time.sleep(random.randint(15, 30))  
-                return self.browser.utils.getBingAccountPoints()
-            except TimeoutException as e:
-                retries += 1
-                logging.error(f"[BING][TimeoutException] Timeout, retrying {retries}/{max_retries} in 5 seconds...\n Error Message: {str(e)}")
-                self.webdriver.refresh()
-                time.sleep(30)
-            except Exception as e:  # 捕获其他异常
-                retries += 1
-                logging.error(f"[BING][Exception] An unexpected error occurred: {str(e)}, retrying {retries}/{max_retries} in 5 seconds...")
-                self.webdriver.refresh()
-                time.sleep(30)
-        logging.error(f"[BING] Failed after {max_retries} retries.")
-        return 0  # 重试失败后返回 0
\ No newline at end of file
+        if not self.submitSearch(word):
+            return 0  # 重试失败后返回 0
+        idleWait(random.randint(15, 30))
+        return self.browser.utils.getBingAccountPoints()
+
+    @tracing.traced("searches.submitSearch", "search")
+    def submitSearch(self, word: str) -> bool:
+        """提交搜索，不等待积分到账。"""
+        if not self.backend.submit(word):
+            return False
+        # 搜索会改变积分和搜索进度
+        self.browser.utils.invalidateDashboard()
+        return True
@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+from src import tracing
+from src.checkpoint import CheckpointJournal
+from src.scheduler import bindToCurrentScheduler, idling
+
+LOG_TAG = "[CMY][STAGE]"
+
+# 阶段使用的资源
+DESKTOP_BROWSER = "desktop"
+MOBILE_BROWSER = "mobile"
+HTTP_ONLY = "http"
+
+# 可以被多个阶段同时使用的资源，其余资源同一时刻只能被一个阶段占用
+SHARED_RESOURCES = {HTTP_ONLY}
+
+
+class Stage:
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        dependsOn: Iterable[str] = (),
+        resources: Iterable[str] = (),
+        checkpoint: bool = True,
+        optional: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.dependsOn = tuple(dependsOn)
+        self.resources = tuple(resources)
+        # 是否在断点日志中记录该阶段，登录等每次运行都必须执行的阶段不记录
+        self.checkpoint = checkpoint
+        # 可选阶段失败时只记录日志，不影响依赖它的阶段，也不会导致整个依赖图失败
+        self.optional = optional
+
+    @property
+    def exclusiveResources(self) -> set:
+        return set(self.resources) - SHARED_RESOURCES
+
+
+class StageGraph:
+    """
+    声明式的阶段依赖图。
+
+    每个阶段声明其依赖的阶段和使用的资源（桌面浏览器、移动端浏览器、仅HTTP），
+    依赖已完成且资源不冲突的阶段会被同时执行。同时满足条件的阶段按声明顺序优先，
+    因此maxParallel为1时的执行顺序与声明顺序一致。
+    """
+
+    def __init__(self, maxParallel: int = 1, journal: Optional[CheckpointJournal] = None):
+        self.maxParallel = max(1, int(maxParallel))
+        self.journal = journal
+        self.stages: dict[str, Stage] = {}
+        self.results: dict[str, Any] = {}
+        self.errors: dict[str, BaseException] = {}
+        self._finished: set = set()
+        self._running: set = set()
+        self._heldResources: set = set()
+        self._lock = threading.Lock()
+        # 有阶段结束时置位，通知调度循环重新检查可执行的阶段
+        self._stageFinished = threading.Event()
+
+    def addStage(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        dependsOn: Iterable[str] = (),
+        resources: Iterable[str] = (),
+        checkpoint: bool = True,
+        optional: bool = False,
+    ) -> Stage:
+        """
+        添加一个阶段。依赖的阶段必须已经添加，从而保证依赖图中没有环。
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        for dependency in dependsOn:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage {name} depends on unknown stage {dependency}")
+        stage = Stage(name, func, dependsOn, resources, checkpoint, optional)
+        self.stages[name] = stage
+        return stage
+
+    def run(self) -> dict:
+        """
+        执行所有阶段，返回每个阶段的结果。某个非可选阶段失败时，依赖它的阶段会被跳过，
+        其余阶段继续执行，全部结束后重新抛出第一个失败阶段的异常。
+        """
+        pending = list(self.stages.values())
+        # 阶段在工作线程中执行，工作线程加入当前线程打开的span（例如账号的span），等待时间也计入其中
+        parentSpans = tracing.currentSpans()
+        with ThreadPoolExecutor(
+            max_workers=self.maxParallel, thread_name_prefix="stage"
+        ) as executor:
+            while True:
+                self._stageFinished.clear()
+                with self._lock:
+                    if not (pending or self._running):
+                        break
+                    for stage in list(pending):
+                        if self._isSkipped(stage):
+                            logging.warning(
+                                f"{LOG_TAG} 阶段 {stage.name} 的依赖执行失败，跳过"
+                            )
+                            pending.remove(stage)
+                            self._finished.add(stage.name)
+                            self.errors.setdefault(stage.name, None)
+                        elif self._isRecorded(stage):
+                            logging.info(f"{LOG_TAG} 阶段 {stage.name} 已在断点日志中完成，跳过")
+                            pending.remove(stage)
+                            self.results[stage.name] = self.journal.getStageResult(stage.name)
+                            self._finished.add(stage.name)
+                        elif self._isReady(stage):
+                            pending.remove(stage)
+                            self._running.add(stage.name)
+                            self._heldResources |= stage.exclusiveResources
+                            executor.submit(bindToCurrentScheduler(self._runStage), stage, parentSpans)
+                    if not self._running:
+                        continue
+                # 等待阶段结束期间让出协作式调度器的执行权，等待时间不计为当前span的执行时间
+                start = time.perf_counter()
+                with idling():
+                    self._stageFinished.wait()
+                tracing.recordSleep(start, time.perf_counter() - start)
+        for name, error in self.errors.items():
+            if error is not None and not self.stages[name].optional:
+                raise error
+        return self.results
+
+    def _isReady(self, stage: Stage) -> bool:
+        return (
+            len(self._running) < self.maxParallel
+            and all(dependency in self._finished for dependency in stage.dependsOn)
+            and not (stage.exclusiveResources & self._heldResources)
+        )
+
+    def _isSkipped(self, stage: Stage) -> bool:
+        return any(
+            dependency in self.errors and not self.stages[dependency].optional
+            for dependency in stage.dependsOn
+        )
+
+    def _isRecorded(self, stage: Stage) -> bool:
+        return (
+            stage.checkpoint
+            and self.journal is not None
+            and self.journal.isStageDone(stage.name)
+        )
+
+    def _runStage(self, stage: Stage, parentSpans: list):
+        logging.info(f"{LOG_TAG} 阶段 {stage.name} 开始执行")
+        username = self.journal.username if self.journal is not None else None
+        try:
+            with tracing.attach(parentSpans), tracing.span(
+                f"stage.{stage.name}", "stage", account=username
+            ):
+                result = stage.func()
+            if stage.checkpoint and self.journal is not None:
+                self.journal.markStageDone(stage.name, result)
+            with self._lock:
+                self.results[stage.name] = result
+            logging.info(f"{LOG_TAG} 阶段 {stage.name} 执行完成")
+        except Exception as e:  # pylint: disable=broad-except
+            logging.error(f"{LOG_TAG} 阶段 {stage.name} 执行失败: {e.__class__.__name__}: {e}")
+            with self._lock:
+                self.errors[stage.name] = e
+        finally:
+            with self._lock:
+                self._running.discard(stage.name)
+                self._heldResources -= stage.exclusiveResources
+                self._finished.add(stage.name)
+            self._stageFinished.set()
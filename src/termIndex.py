@@ -0,0 +1,142 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable, Optional
+
+LOG_TAG = "[CMY][TERMS]"
+
+INDEX_PATH = Path(__file__).resolve().parent.parent / "cache" / "term_usage.sqlite3"
+# 超过该天数的记录在打开索引时删除
+RETENTION_DAYS = 30
+# 所有账号最近使用时未获得积分的次数达到该值的搜索词不再使用
+MAX_UNCREDITED = 2
+# 查询时每批的搜索词数量，需低于SQLite单条语句的参数个数上限
+QUERY_BATCH = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS term_usage (
+    account TEXT NOT NULL,
+    term TEXT NOT NULL,
+    day TEXT NOT NULL,
+    used_at REAL NOT NULL,
+    credited INTEGER,
+    PRIMARY KEY (account, term, day)
+);
+CREATE INDEX IF NOT EXISTS term_usage_term ON term_usage (term, day);
+"""
+
+
+class TermIndex:
+    """
+    搜索词使用记录，保存在 cache/term_usage.sqlite3 中，多个进程共享。
+
+    记录每个账号每天使用过的搜索词以及搜索后是否获得了积分，
+    TermProvider据此只给账号分配最近没有使用过、也没有在其他账号上反复失败的搜索词。
+    """
+
+    def __init__(self, path: Path = INDEX_PATH, reuseDays: int = 7):
+        self.path = path
+        self.reuseDays = reuseDays
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), timeout=10, check_same_thread=False)
+        with self._lock, self._conn:
+            # WAL模式下多个进程可以同时读，写入时不会阻塞读取
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(
+                "DELETE FROM term_usage WHERE day < ?",
+                ((date.today() - timedelta(days=RETENTION_DAYS)).isoformat(),),
+            )
+
+    def usedTerms(self, account: str, terms: Iterable[str]) -> set:
+        """terms中不应该再分配给account的搜索词。"""
+        terms = list(dict.fromkeys(terms))
+        since = (date.today() - timedelta(days=self.reuseDays)).isoformat()
+        used = set()
+        try:
+            with self._lock:
+                for start in range(0, len(terms), QUERY_BATCH):
+                    batch = terms[start : start + QUERY_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"""
+                        SELECT term FROM term_usage
+                        WHERE term IN ({placeholders}) AND day >= ?
+                        GROUP BY term
+                        HAVING SUM(account = ?) > 0 OR SUM(credited = 0) >= ?
+                        """,
+                        (*batch, since, account, MAX_UNCREDITED),
+                    ).fetchall()
+                    used.update(row[0] for row in rows)
+        except sqlite3.Error as e:
+            # 其他进程长时间占用数据库时不过滤搜索词，不影响搜索
+            logging.warning(f"{LOG_TAG} 读取搜索词使用记录失败: {e}")
+            return set()
+        return used
+
+    def filterFresh(self, account: str, terms: list) -> list:
+        used = self.usedTerms(account, terms)
+        return [term for term in terms if term not in used]
+
+    def record(self, account: str, term: str, credited: Optional[bool]):
+        """记录一次搜索，credited为None表示搜索失败，无法判断是否获得积分。"""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    """
+                    INSERT INTO term_usage (account, term, day, used_at, credited)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (account, term, day)
+                    DO UPDATE SET used_at = excluded.used_at, credited = excluded.credited
+                    """,
+                    (
+                        account,
+                        term,
+                        date.today().isoformat(),
+                        time.time(),
+                        None if credited is None else int(credited),
+                    ),
+                )
+        except sqlite3.Error as e:
+            logging.warning(f"{LOG_TAG} 记录搜索词使用情况失败: {e}")
+
+    def creditRate(self, account: str, day: Optional[date] = None) -> tuple:
+        """返回(获得积分的搜索次数, 已判断结果的搜索次数)。"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    """
+                    SELECT COALESCE(SUM(credited = 1), 0), COUNT(credited)
+                    FROM term_usage WHERE account = ? AND day = ?
+                    """,
+                    (account, (day or date.today()).isoformat()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"{LOG_TAG} 读取搜索词使用记录失败: {e}")
+            return 0, 0
+        return row[0], row[1]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_index: Optional[TermIndex] = None
+_indexLock = threading.Lock()
+
+
+def getTermIndex(reuseDays: int = 7) -> Optional[TermIndex]:
+    """进程内共享的TermIndex，打开失败时返回None，此时不过滤搜索词。"""
+    global _index
+    with _indexLock:
+        if _index is None:
+            try:
+                _index = TermIndex(reuseDays=reuseDays)
+            except (OSError, sqlite3.Error) as e:
+                logging.warning(f"{LOG_TAG} 打开搜索词使用记录失败: {e}")
+                return None
+        return _index
@@ -0,0 +1,289 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+LOG_TAG = "[CMY][TRACE]"
+
+TRACES_DIR = Path(__file__).resolve().parent.parent / "logs" / "traces"
+
+_enabled = False
+_lock = threading.Lock()
+# 已结束的span，以Chrome trace event格式保存
+_events: list = []
+_jsonlPath: Optional[Path] = None
+_chromeTracePath: Optional[Path] = None
+_outputDir: Optional[Path] = None
+# 同一秒内多次flush时区分文件名
+_fileSequence = 0
+# 每个线程当前打开的span栈，元素为(span, 该线程在span中的ThreadSlice)
+_local = threading.local()
+
+
+class Span:
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.startWall = time.time()
+        self.start = time.perf_counter()
+        # 在span中执行过的每个线程，创建span的线程之外，其他线程通过attach加入
+        self.threads = [ThreadSlice(self.start)]
+        # 主动等待（time.sleep、空闲等待）的累计时间，span结束时计算
+        self.sleep = 0.0
+
+
+class ThreadSlice:
+    """一个线程在span中执行的时间段，以及其中主动等待的时间段。"""
+
+    def __init__(self, start: float):
+        self.start = start
+        self.end: Optional[float] = None
+        self.sleeps: list = []
+
+    def activeIntervals(self, end: float) -> list:
+        """去掉等待时间后实际执行的时间段。"""
+        intervals = []
+        cursor = self.start
+        stop = self.end if self.end is not None else end
+        for sleepStart, sleepEnd in sorted(self.sleeps):
+            if sleepStart >= stop:
+                break
+            if sleepStart > cursor:
+                intervals.append((cursor, sleepStart))
+            cursor = max(cursor, sleepEnd)
+        if cursor < stop:
+            intervals.append((cursor, stop))
+        return intervals
+
+
+def _activeTime(current: Span, end: float) -> float:
+    """至少有一个线程在实际执行的总时间，多个线程同时执行的时间只计算一次。"""
+    intervals = sorted(
+        interval for thread in current.threads for interval in thread.activeIntervals(end)
+    )
+    total = 0.0
+    mergedStart = mergedEnd = None
+    for start, stop in intervals:
+        if mergedEnd is None or start > mergedEnd:
+            if mergedEnd is not None:
+                total += mergedEnd - mergedStart
+            mergedStart, mergedEnd = start, stop
+        else:
+            mergedEnd = max(mergedEnd, stop)
+    if mergedEnd is not None:
+        total += mergedEnd - mergedStart
+    return total
+
+
+def configure(enabled: bool, outputDir: Optional[Path] = None):
+    """
+    开启或关闭耗时统计。开启后每个span结束时追加写入JSONL文件，
+    flush时写出可以在 chrome://tracing 或 Perfetto 中打开的trace文件。
+    """
+    global _enabled, _outputDir
+    _enabled = enabled
+    if not enabled:
+        return
+    _outputDir = outputDir or TRACES_DIR
+    _outputDir.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        _startFiles()
+    logging.info(f"{LOG_TAG} 耗时统计已开启，输出文件: {_jsonlPath}")
+
+
+def _startFiles():
+    """切换到一组新的输出文件，调用方需要持有_lock。"""
+    global _jsonlPath, _chromeTracePath, _fileSequence
+    _fileSequence += 1
+    baseName = (
+        f"trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{_fileSequence}"
+    )
+    _jsonlPath = _outputDir / f"{baseName}.jsonl"
+    _chromeTracePath = _outputDir / f"{baseName}.json"
+
+
+def isEnabled() -> bool:
+    return _enabled
+
+
+def _spanStack() -> list:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+@contextlib.contextmanager
+def span(name: str, category: str = "function", **args):
+    """记录一段代码的耗时，区分实际执行时间和主动等待时间。"""
+    if not _enabled:
+        yield
+        return
+    current = Span(name, category, args)
+    stack = _spanStack()
+    stack.append((current, current.threads[0]))
+    try:
+        yield current
+    finally:
+        stack.pop()
+        _finishSpan(current)
+
+
+def currentSpans() -> list:
+    """当前线程打开的span，传给其他线程的attach，使其他线程中的等待也计入这些span。"""
+    return [openSpan for openSpan, _ in _spanStack()]
+
+
+@contextlib.contextmanager
+def attach(spans: list):
+    """
+    在其他线程中加入父线程打开的span，例如阶段依赖图的工作线程加入账号的span。
+
+    加入期间该线程的执行和等待时间都计入这些span，多个线程同时执行的时间只计算一次，
+    所有线程都在等待时才计为span的等待时间。
+    """
+    if not _enabled or not spans:
+        yield
+        return
+    stack = _spanStack()
+    start = time.perf_counter()
+    slices = []
+    with _lock:
+        for openSpan in spans:
+            threadSlice = ThreadSlice(start)
+            openSpan.threads.append(threadSlice)
+            slices.append((openSpan, threadSlice))
+    stack[:0] = slices
+    try:
+        yield
+    finally:
+        del stack[: len(slices)]
+        end = time.perf_counter()
+        with _lock:
+            for _, threadSlice in slices:
+                threadSlice.end = end
+
+
+def traced(name: str, category: str = "function") -> Callable:
+    """为函数或方法添加span的装饰器。"""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def sleep(seconds: float):
+    """主动等待，等同于time.sleep，等待时间会计入当前线程所有打开的span（包括attach加入的span）。"""
+    start = time.perf_counter()
+    time.sleep(seconds)
+    recordSleep(start, time.perf_counter() - start)
+
+
+def recordSleep(start: float, seconds: float):
+    """
+    把一段等待时间计入当前线程所有打开的span，并记录为一个独立的sleep事件。
+
+    Args:
+        start (float): 开始等待时的time.perf_counter()。
+        seconds (float): 等待时长。
+    """
+    if not _enabled:
+        return
+    stack = _spanStack()
+    with _lock:
+        for _, threadSlice in stack:
+            threadSlice.sleeps.append((start, start + seconds))
+    if stack:
+        innermost = stack[-1][0]
+        offset = start - innermost.start
+        _addEvent(
+            {
+                "name": "sleep",
+                "cat": "sleep",
+                "ph": "X",
+                "ts": int((innermost.startWall + offset) * 1e6),
+                "dur": int(seconds * 1e6),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "args": {},
+            }
+        )
+
+
+def _finishSpan(current: Span):
+    end = time.perf_counter()
+    wall = end - current.start
+    with _lock:
+        current.threads[0].end = end
+        current.sleep = max(0.0, wall - _activeTime(current, end))
+    record = {
+        "name": current.name,
+        "cat": current.category,
+        "start": current.startWall,
+        "wall": round(wall, 6),
+        "active": round(max(0.0, wall - current.sleep), 6),
+        "sleep": round(current.sleep, 6),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "thread": threading.current_thread().name,
+        "args": current.args,
+    }
+    _addEvent(
+        {
+            "name": current.name,
+            "cat": current.category,
+            "ph": "X",
+            "ts": int(current.startWall * 1e6),
+            "dur": int(wall * 1e6),
+            "pid": record["pid"],
+            "tid": record["tid"],
+            "args": dict(current.args, active=record["active"], sleep=record["sleep"]),
+        }
+    )
+    with _lock:
+        try:
+            with open(_jsonlPath, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logging.warning(f"{LOG_TAG} 写入耗时统计失败: {e}")
+
+
+def _addEvent(event: dict):
+    with _lock:
+        _events.append(event)
+
+
+def flush():
+    """
+    写出Chrome trace event格式的文件，并清空已写出的事件。
+
+    之后的span写入一组新的文件，常驻模式下每次flush的文件只包含上次flush之后的事件，内存占用不会一直增长。
+    """
+    global _events
+    if not _enabled:
+        return
+    with _lock:
+        events, _events = _events, []
+        chromeTracePath = _chromeTracePath
+        _startFiles()
+    try:
+        chromeTracePath.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, default=str),
+            encoding="utf-8",
+        )
+        logging.info(f"{LOG_TAG} trace文件已写入: {chromeTracePath}")
+    except OSError as e:
+        logging.warning(f"{LOG_TAG} 写入trace文件失败: {e}")
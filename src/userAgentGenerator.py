@@ -7,6 +7,8 @@ from requests import HTTPError, Response
 import logging
 import time
 
+from src import httpClient
+
 LOG_TAG = "[CMY]"
 
 
@@ -223,7 +225,7 @@ class GenerateUserAgent:
         
         for attempt in range(max_retries):
             try:
-                response = requests.get(url, timeout=timeout)
+                response = httpClient.get(url, timeout=timeout)
                 if response.status_code == requests.codes.ok:  # pylint: disable=no-member
                     return response
                 else:
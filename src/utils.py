@@ -4,28 +4,158 @@ import locale as pylocale
 import time
 import urllib.parse
 from pathlib import Path
+from typing import Callable
 
 import requests
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.remote.webelement import WebElement
-from selenium.common.exceptions import WebDriverException
 
+from . import httpClient, tracing, waits
 from .constants import BASE_URL
 
 import logging
 
 LOG_TAG = "[CMY]"
 
+# 与rewards页面中dashboard对象内容相同的接口
+DASHBOARD_API_URL = f"{BASE_URL}/api/getuserinfo?type=1"
+# 读取积分的接口
+BING_INFO_URL = "https://cn.bing.com/rewards/panelflyout/getuserinfo"
+
+# goHome的结果
+GO_HOME_OK = "ok"
+GO_HOME_INTERSTITIAL = "interstitial"
+GO_HOME_LOGGED_OUT = "logged_out"
+GO_HOME_DEAD_SESSION = "dead_session"
+# 跳转到这些域名说明账号已退出登录
+LOGIN_HOSTNAMES = ("login.live.com", "login.microsoftonline.com")
+
+
+class GoHomeError(Exception):
+    """无法打开rewards主页，当前账号后续依赖rewards页面的步骤无法继续。"""
+
+    def __init__(self, outcome: str):
+        super().__init__(f"无法打开rewards主页: {outcome}")
+        self.outcome = outcome
+
+# 页面中的dashboard对象已经可用
+DASHBOARD_READY = "typeof dashboard !== 'undefined' && dashboard.userStatus"
+
+# 在页面中按路径取出dashboard的部分字段，只把需要的数据通过WebDriver传回
+DASHBOARD_PROJECTION_SCRIPT = """
+const result = {};
+for (const path of arguments[0]) {
+    let value = dashboard;
+    for (const key of path.split(".")) {
+        if (value === undefined || value === null) break;
+        value = value[key];
+    }
+    result[path] = value === undefined ? null : value;
+}
+return result;
+"""
+
+
+# 按probeSpec查询多个元素的函数probe(specs)，其他脚本也可以在同一次execute_script中调用
+PROBE_JS = waits.FIND_ELEMENT_JS + """
+function describe(element, spec) {
+    const attributes = {};
+    for (const name of spec.attributes || []) attributes[name] = element.getAttribute(name);
+    const visible = isVisible(element);
+    let clicked = false;
+    if (spec.click && visible) {
+        element.click();
+        clicked = true;
+    }
+    return {
+        visible: visible,
+        text: spec.text ? element.innerText : null,
+        attributes: attributes,
+        clicked: clicked,
+    };
+}
+function probe(specs) {
+    return specs.map((spec) => {
+        if (spec.all) {
+            return findElements(spec.by, spec.selector).map((element) => describe(element, spec));
+        }
+        const element = findElement(spec.by, spec.selector);
+        return element ? describe(element, spec) : null;
+    });
+}
+"""
+
+# 在一次execute_script中查询多个元素，见Utils.probe
+PROBE_SCRIPT = PROBE_JS + "return probe(arguments[0]);"
+
+
+def probeSpec(
+    by: str,
+    selector: str,
+    attributes: list = None,
+    text: bool = False,
+    click: bool = False,
+    findAll: bool = False,
+) -> dict:
+    """
+    生成Utils.probe的查询条件。
+
+    Args:
+        attributes (list): 需要读取的属性名。
+        text (bool): 是否读取元素的文本（innerText）。
+        click (bool): 元素可见时是否点击。
+        findAll (bool): 是否返回所有匹配的元素。
+    """
+    return {
+        "by": by,
+        "selector": selector,
+        "attributes": attributes or [],
+        "text": text,
+        "click": click,
+        "all": findAll,
+    }
+
+
+def projectDashboard(dashboard: dict, paths: list) -> dict:
+    """与DASHBOARD_PROJECTION_SCRIPT相同，从已读取的dashboard中按路径取出字段。"""
+    result = {}
+    for path in paths:
+        value = dashboard
+        for key in path.split("."):
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+        result[path] = value
+    return result
+
 
 class Utils:
-    def __init__(self, webdriver: WebDriver):
+    def __init__(self, webdriver: WebDriver, getUserAgent: Callable[[], str]):
         self.webdriver = webdriver
+        # 浏览器当前身份的User-Agent，HTTP请求与浏览器使用相同的User-Agent，切换身份后随之变化
+        self.getUserAgent = getUserAgent
         with contextlib.suppress(Exception):
             locale = pylocale.getdefaultlocale()[0]
             pylocale.setlocale(pylocale.LC_NUMERIC, locale)
+        config = self.load_config()
+        # dashboard数据缓存，完成活动和搜索后主动失效，超过dashboard_cache_ttl秒后重新获取
+        self.dashboardCacheTtl = config.get("dashboard_cache_ttl", 60)
+        self._dashboardCache = None
+        self._dashboardCachedAt = 0.0
+        self.dashboardCacheHits = 0
+        self.dashboardCacheMisses = 0
+        # 通过HTTP读取dashboard，失败时才跳转到rewards页面读取
+        self.dashboardOverHttp = config.get("dashboard_over_http", True)
+        # 与浏览器同步的Cookie，HTTP请求通过共享的连接池发送
+        self.cookieBridge = httpClient.BrowserCookieBridge(webdriver)
+        # 每次goHome的时间预算（秒），以及各种结果和恢复操作的次数
+        self.goHomeBudget = config.get("go_home_budget", 120)
+        self.goHomeMetrics: dict[str, int] = {}
 
     def waitUntilVisible(self, by: str, selector: str, timeToWait: float = 10):
         WebDriverWait(self.webdriver, timeToWait).until(
@@ -43,26 +173,16 @@ class Utils:
         loadingTimeAllowed = 5
         refreshsAllowed = 5
 
-        checkingInterval = 0.5
-        checks = loadingTimeAllowed / checkingInterval
-
-        tries = 0
         refreshCount = 0
         while True:
-            try:
-                self.webdriver.find_element(by, selector)
+            # 元素出现后立即返回，不再按固定间隔轮询
+            if waits.waitForElement(self.webdriver, by, selector, loadingTimeAllowed):
                 return True
-            except Exception:  # pylint: disable=broad-except
-                if tries < checks:
-                    tries += 1
-                    time.sleep(checkingInterval)
-                elif refreshCount < refreshsAllowed:
-                    self.webdriver.refresh()
-                    refreshCount += 1
-                    tries = 0
-                    time.sleep(5)
-                else:
-                    return False
+            if refreshCount >= refreshsAllowed:
+                return False
+            self.webdriver.refresh()
+            refreshCount += 1
+            waits.waitForLoad(self.webdriver, 5)
 
     def waitUntilQuestionRefresh(self):
         return self.waitForMSRewardElement(By.CLASS_NAME, "rqECredits")
@@ -71,116 +191,283 @@ class Utils:
         return self.waitForMSRewardElement(By.XPATH, '//*[@id="rqStartQuiz"]')
 
     def resetTabs(self):
+        # 出错时活动可能已经部分完成，dashboard数据不再可信
+        self.invalidateDashboard()
         try:
             curr = self.webdriver.current_window_handle
 
             for handle in self.webdriver.window_handles:
                 if handle != curr:
                     self.webdriver.switch_to.window(handle)
-                    time.sleep(0.5)
+                    tracing.sleep(0.5)
                     self.webdriver.close()
-                    time.sleep(0.5)
+                    tracing.sleep(0.5)
 
             self.webdriver.switch_to.window(curr)
-            time.sleep(0.5)
-            self.goHome()
+            tracing.sleep(0.5)
+            self.ensureHome(strict=False)
+        except GoHomeError:
+            raise
         except Exception:  # pylint: disable=broad-except
-            self.goHome()
-
-    def goHome(self):
-        reloadThreshold = 5
-        reloadInterval = 10
-        targetUrl = urllib.parse.urlparse(BASE_URL)
-        
-        # 检查会话是否有效
-        try:
-            self.webdriver.current_url
-        except Exception:
-            logging.error("WebDriver会话已失效，无法导航到主页")
-            return False
-            
-        try:
-            self.webdriver.get(BASE_URL)
-        except WebDriverException as e:
-            logging.error(f"WebDriver异常: 无法导航到主页 {BASE_URL}: {e}")
-            self.webdriver.refresh()
-            time.sleep(10)
-        except Exception as e:
-            logging.error(f"未知异常: 无法导航到主页 {BASE_URL}: {e}")
-            self.webdriver.refresh()
-            time.sleep(10)
-        reloads = 0
-        interval = 15
-        intervalCount = 0
+            self.ensureHome(strict=False)
 
-        while True:
-            # 增加会话有效性检查
-            try:
-                self.webdriver.current_url
-            except Exception:
-                logging.error("会话在导航过程中失效，终止goHome操作")
-                return False
-                
-            self.tryDismissCookieBanner()
-            try:
-                # 使用 WebDriverWait 等待元素出现，设置超时时间为 5 秒
-                WebDriverWait(self.webdriver, 15).until(
-                    ec.presence_of_element_located((By.ID, "reward_header_rewards"))
-                )
-                break
-            except Exception as e:
-                # 输出详细的错误信息
-                logging.warning(f"Element 'reward_header_rewards' not found: {e}")
+    @tracing.traced("utils.goHome", "navigation")
+    def goHome(self) -> str:
+        """
+        跳转到rewards主页，在go_home_budget秒内完成，返回跳转结果。
 
-            currentUrl = urllib.parse.urlparse(self.webdriver.current_url)
-            if (
-                currentUrl.hostname != targetUrl.hostname
-            ) and self.tryDismissAllMessages():
-                logging.info("Current URL doesn't match target URL. Navigating back to home.")
-                time.sleep(10)
+        状态机：navigate（打开主页）-> wait（等待头部元素）-> classify（判断当前页面）
+        -> recover（关闭弹窗后重新打开主页，或刷新页面）-> wait ...，
+        预算用完、会话失效或账号已退出登录时立即结束。
+
+        Returns:
+            str: GO_HOME_OK、GO_HOME_INTERSTITIAL、GO_HOME_LOGGED_OUT或GO_HOME_DEAD_SESSION。
+        """
+        deadline = waits.Deadline(self.goHomeBudget)
+        state = "navigate"
+        outcome = GO_HOME_INTERSTITIAL
+        while not deadline.expired():
+            if state == "navigate":
                 try:
                     self.webdriver.get(BASE_URL)
+                except Exception as e:  # pylint: disable=broad-except
+                    logging.error(f"{LOG_TAG} 无法导航到主页 {BASE_URL}: {e}")
+                    self.recordGoHome("navigate_error")
+                state = "wait"
+            elif state == "wait":
+                self.tryDismissCookieBanner()
+                try:
+                    found = waits.waitForElement(
+                        self.webdriver, By.ID, "reward_header_rewards", min(15, deadline.remaining())
+                    )
                 except WebDriverException as e:
-                    logging.error(f"WebDriver异常: 无法导航到主页: {e}")
-                    self.webdriver.refresh()
-                    time.sleep(10)
-                except Exception as e:
-                    logging.error(f"未知异常: 无法导航到主页: {e}")
-                    self.webdriver.refresh()
-                    time.sleep(10)
-
-            time.sleep(interval)
-            intervalCount += 1
-            if intervalCount >= reloadInterval:
-                intervalCount = 0
-                reloads += 1
-                logging.info(f"Refreshing page. Reload count: {reloads}")
-                self.webdriver.refresh()
-                if reloads >= reloadThreshold:
-                    logging.info("Reached reload threshold. Exiting goHome loop.")
+                    # 等待脚本只重试页面跳转等错误，会话失效时直接抛出
+                    logging.error(f"{LOG_TAG} 等待主页加载时WebDriver会话已失效: {e}")
+                    outcome = GO_HOME_DEAD_SESSION
                     break
+                if found:
+                    outcome = GO_HOME_OK
+                    break
+                state = "classify"
+            elif state == "classify":
+                outcome = self.classifyHomePage()
+                if outcome in (GO_HOME_OK, GO_HOME_LOGGED_OUT, GO_HOME_DEAD_SESSION):
+                    break
+                state = "recover"
+            elif state == "recover":
+                # 能关闭弹窗时重新打开主页，否则刷新页面
+                if self.tryDismissAllMessages():
+                    self.recordGoHome("dismiss_messages")
+                    try:
+                        waits.waitForNetworkIdle(self.webdriver, min(10, deadline.remaining()))
+                    except WebDriverException as e:
+                        logging.error(f"{LOG_TAG} 关闭弹窗后WebDriver会话已失效: {e}")
+                        outcome = GO_HOME_DEAD_SESSION
+                        break
+                    state = "navigate"
+                else:
+                    self.recordGoHome("refresh")
+                    try:
+                        self.webdriver.refresh()
+                    except Exception as e:  # pylint: disable=broad-except
+                        logging.error(f"{LOG_TAG} 刷新页面失败: {e}")
+                    state = "wait"
+        else:
+            logging.warning(f"{LOG_TAG} goHome在{self.goHomeBudget}秒内未能打开rewards主页")
+        self.recordGoHome(outcome)
+        if outcome != GO_HOME_OK:
+            logging.error(f"{LOG_TAG} goHome结束，结果: {outcome}")
+        return outcome
+
+    def ensureHome(self, strict: bool = True) -> str:
+        """
+        调用goHome并检查结果，账号已退出登录或WebDriver会话已失效时抛出GoHomeError，
+        strict为True时停留在其他页面（GO_HOME_INTERSTITIAL）也抛出。
+
+        Returns:
+            str: goHome的结果。
+        """
+        outcome = self.goHome()
+        if outcome in (GO_HOME_LOGGED_OUT, GO_HOME_DEAD_SESSION) or (
+            strict and outcome != GO_HOME_OK
+        ):
+            raise GoHomeError(outcome)
+        return outcome
+
+    def classifyHomePage(self) -> str:
+        try:
+            currentUrl = urllib.parse.urlparse(self.webdriver.current_url)
+        except Exception:  # pylint: disable=broad-except
+            logging.error(f"{LOG_TAG} WebDriver会话已失效，无法导航到主页")
+            return GO_HOME_DEAD_SESSION
+        if currentUrl.hostname in LOGIN_HOSTNAMES or currentUrl.path.startswith("/welcome"):
+            logging.error(f"{LOG_TAG} 账号已退出登录，当前页面: {currentUrl.geturl()}")
+            return GO_HOME_LOGGED_OUT
+        with contextlib.suppress(Exception):
+            if self.webdriver.find_elements(By.ID, "reward_header_rewards"):
+                return GO_HOME_OK
+        logging.info(f"{LOG_TAG} 当前页面不是rewards主页: {currentUrl.geturl()}")
+        return GO_HOME_INTERSTITIAL
+
+    def recordGoHome(self, event: str):
+        """记录goHome的结果和每种恢复操作的次数。"""
+        self.goHomeMetrics[event] = self.goHomeMetrics.get(event, 0) + 1
+
+    def probe(self, specs: list) -> list:
+        """
+        在一次execute_script中查询多个元素，代替多次find_element。
+
+        Args:
+            specs (list): probeSpec生成的查询条件列表。
+
+        Returns:
+            list: 与specs一一对应。元素不存在时为None，否则为包含visible、text、attributes和clicked的字典；
+                findAll为True时为所有匹配元素的字典列表。
+        """
+        return self.webdriver.execute_script(PROBE_SCRIPT, specs)
 
     def getAnswerCode(self, key: str, string: str) -> str:
         t = sum(ord(string[i]) for i in range(len(string)))
         t += int(key[-2:], 16)
         return str(t)
 
-    def getDashboardData(self) -> dict:
+    @tracing.traced("utils.getDashboardData", "dashboard")
+    def getDashboardData(self, forceRefresh: bool = False) -> dict:
+        """
+        获取rewards页面的dashboard数据，缓存未过期时直接返回缓存。
+
+        命中缓存时不会跳转到rewards页面，需要在页面上点击元素的调用方要先调用goHome。
+        """
+        if not forceRefresh and self.isDashboardCached():
+            self.dashboardCacheHits += 1
+            return self._dashboardCache
+        self.dashboardCacheMisses += 1
+        dashboard = self.fetchDashboardData()
+        self.cacheDashboard(dashboard)
+        return dashboard
+
+    def queryDashboard(self, paths: list) -> dict:
+        """
+        只读取dashboard中的部分字段，返回路径到值的字典，路径不存在时值为None。
+
+        优先使用缓存或HTTP接口读取的完整dashboard，都不可用时在rewards页面中按路径取出字段，
+        避免通过WebDriver传输整个dashboard对象。
+
+        Args:
+            paths (list): 以点分隔的字段路径，例如"userStatus.availablePoints"。
+        """
+        if self.isDashboardCached():
+            self.dashboardCacheHits += 1
+            return projectDashboard(self._dashboardCache, paths)
+        self.dashboardCacheMisses += 1
+        if self.dashboardOverHttp:
+            dashboard = self.fetchDashboardDataOverHttp()
+            if dashboard is not None:
+                self.cacheDashboard(dashboard)
+                return projectDashboard(dashboard, paths)
+        return self.queryDashboardFromPage(paths)
+
+    @tracing.traced("utils.queryDashboardFromPage", "dashboard")
+    def queryDashboardFromPage(self, paths: list) -> dict:
+        self.ensureHome()
+        # 等待页面脚本定义dashboard对象，最多8秒
+        waits.waitForCondition(self.webdriver, DASHBOARD_READY, 8)
+        return self.webdriver.execute_script(DASHBOARD_PROJECTION_SCRIPT, list(paths))
+
+    def isDashboardCached(self) -> bool:
+        return (
+            self._dashboardCache is not None
+            and time.monotonic() - self._dashboardCachedAt < self.dashboardCacheTtl
+        )
+
+    def cacheDashboard(self, dashboard: dict):
+        self._dashboardCache = dashboard
+        self._dashboardCachedAt = time.monotonic()
+
+    def fetchDashboardData(self) -> dict:
+        if self.dashboardOverHttp:
+            dashboard = self.fetchDashboardDataOverHttp()
+            if dashboard is not None:
+                return dashboard
+            logging.warning(f"{LOG_TAG} 通过HTTP读取dashboard失败，改为从rewards页面读取")
+        return self.fetchDashboardDataFromPage()
+
+    @tracing.traced("utils.fetchDashboardDataOverHttp", "dashboard")
+    def fetchDashboardDataOverHttp(self):
+        """
+        使用浏览器当前的Cookie请求dashboard接口，不需要跳转页面，失败时返回None。
+        """
+        dashboardUrl = urllib.parse.urlparse(DASHBOARD_API_URL)
+        try:
+            response = httpClient.get(
+                DASHBOARD_API_URL,
+                cookies=self.cookieBridge.cookiesFor(dashboardUrl.hostname, dashboardUrl.path),
+                headers={"User-Agent": self.getUserAgent(), "Referer": f"{BASE_URL}/"},
+                timeout=15,
+            )
+            response.raise_for_status()
+            dashboard = response.json().get("dashboard")
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning(f"{LOG_TAG} dashboard接口请求失败: {e}")
+            return None
+        # 未登录时接口返回的dashboard为空
+        if not isinstance(dashboard, dict) or "userStatus" not in dashboard:
+            return None
+        return dashboard
+
+    @tracing.traced("utils.fetchDashboardDataFromPage", "dashboard")
+    def fetchDashboardDataFromPage(self) -> dict:
         # 在获取dashboard时必须确保页面已经在rewards界面，否则会报错。在执行每日活动时是正常的，但是在搜索时是不在reward界面，因此改为每次获取dashboard时都先跳转到reward界面
-        self.goHome()
-        # 等到8s
-        time.sleep(8)
+        self.ensureHome()
+        # 等待页面脚本定义dashboard对象，最多8秒
+        waits.waitForCondition(self.webdriver, DASHBOARD_READY, 8)
         return self.webdriver.execute_script("return dashboard")
 
-    def getBingInfo(self):
-        cookieJar = self.webdriver.get_cookies()
-        cookies = {cookie["name"]: cookie["value"] for cookie in cookieJar}
+    def isOfferComplete(self, offerId: str) -> bool:
+        """
+        重新读取dashboard，判断offerId对应的活动（每日活动、更多活动或打卡活动）是否已经完成。
+
+        完成活动的方法会自己捕获异常，返回不代表活动已经完成，确认完成后才写入断点日志。
+        """
+        self.invalidateDashboard()
+        data = self.queryDashboard(["dailySetPromotions", "morePromotions", "punchCards"])
+        promotions = [
+            promotion
+            for dayPromotions in (data["dailySetPromotions"] or {}).values()
+            for promotion in dayPromotions
+        ]
+        promotions += data["morePromotions"] or []
+        promotions += [card.get("parentPromotion") or {} for card in data["punchCards"] or []]
+        return any(
+            promotion.get("offerId") == offerId and promotion.get("complete") is True
+            for promotion in promotions
+        )
+
+    def invalidateDashboard(self):
+        """完成活动或搜索后调用，下次获取dashboard时重新从页面读取。"""
+        self._dashboardCache = None
+
+    def reportMetrics(self):
+        logging.info(
+            f"{LOG_TAG} dashboard缓存命中 {self.dashboardCacheHits} 次，"
+            f"未命中 {self.dashboardCacheMisses} 次"
+        )
+        if self.goHomeMetrics:
+            logging.info(f"{LOG_TAG} goHome统计: {self.goHomeMetrics}")
+
+    def bingInfoCookies(self) -> dict:
+        """请求积分接口时发送的Cookie。"""
+        bingInfoUrl = urllib.parse.urlparse(BING_INFO_URL)
+        return self.cookieBridge.cookiesFor(bingInfoUrl.hostname, bingInfoUrl.path)
+
+    def getBingInfo(self, cookies: dict = None, maxTries: int = 5):
+        if cookies is None:
+            cookies = self.bingInfoCookies()
         tries = 0
-        maxTries = 5
         while tries < maxTries:
             with contextlib.suppress(Exception):
-                response = requests.get(
-                    "https://cn.bing.com/rewards/panelflyout/getuserinfo",
+                response = httpClient.get(
+                    BING_INFO_URL,
                     cookies=cookies,
                 )
                 if response.status_code == requests.codes.ok:
@@ -189,7 +476,9 @@ class Utils:
                 else:
                     pass
             tries += 1
-            time.sleep(1)
+            # 登录跳转过程中Cookie可能还在变化，重试前重新同步
+            self.cookieBridge.markStale()
+            tracing.sleep(1)
         logging.info(f"{LOG_TAG} Failed to get Bing info!")
         return None
 
@@ -201,7 +490,7 @@ class Utils:
             return False
 
     def getAccountPoints(self) -> int:
-        return self.getDashboardData()["userStatus"]["availablePoints"]
+        return self.queryDashboard(["userStatus.availablePoints"])["userStatus.availablePoints"]
 
     def getBingAccountPoints(self) -> int:
         data = self.getBingInfo()
@@ -220,66 +509,69 @@ class Utils:
             (By.CSS_SELECTOR, ".ms-Button.ms-Button--primary"),
             (By.CSS_SELECTOR, '[data-testid="primaryButton"]'),
         ]
-        result = False
-        for button in buttons:
-            try:
-                self.webdriver.find_element(button[0], button[1]).click()
-                result = True
-            except Exception:  # pylint: disable=broad-except
-                continue
-        return result
+        # 一次调用中依次点击所有可见的按钮
+        try:
+            results = self.probe([probeSpec(by, selector, click=True) for by, selector in buttons])
+        except Exception:  # pylint: disable=broad-except
+            return False
+        return any(result and result["clicked"] for result in results)
 
     def tryDismissCookieBanner(self):
         with contextlib.suppress(Exception):
             self.webdriver.find_element(By.ID, "cookie-banner").find_element(
                 By.TAG_NAME, "button"
             ).click()
-            time.sleep(2)
+            tracing.sleep(2)
 
     def tryDismissBingCookieBanner(self):
         with contextlib.suppress(Exception):
             self.webdriver.find_element(By.ID, "bnp_btn_accept").click()
-            time.sleep(2)
+            tracing.sleep(2)
 
     def switchToNewTab(self, timeToWait: int = 0):
-        time.sleep(0.5)
+        tracing.sleep(0.5)
         self.webdriver.switch_to.window(window_name=self.webdriver.window_handles[1])
         if timeToWait > 0:
-            time.sleep(timeToWait)
+            tracing.sleep(timeToWait)
 
     def closeCurrentTab(self):
         self.webdriver.close()
-        time.sleep(0.5)
+        tracing.sleep(0.5)
         self.webdriver.switch_to.window(window_name=self.webdriver.window_handles[0])
-        time.sleep(0.5)
+        tracing.sleep(0.5)
 
     def visitNewTab(self, timeToWait: int = 0):
         self.switchToNewTab(timeToWait)
         self.closeCurrentTab()
 
     def getRemainingSearches(self):
-        dashboard = self.getDashboardData()
+        fields = self.queryDashboard([
+            "userStatus.counters.pcSearch",
+            "userStatus.counters.mobileSearch",
+            "userStatus.levelInfo.activeLevel",
+        ])
         searchPoints = 3 # 目前每次搜索获得的积分为3
-        counters = dashboard["userStatus"]["counters"]
+        pcSearch = fields["userStatus.counters.pcSearch"]
 
-        if "pcSearch" not in counters:
+        if pcSearch is None:
             return 0, 0
         progressDesktop = 0
 
-        for item in counters['pcSearch']:
+        for item in pcSearch:
             progressDesktop += item.get('pointProgress', 0)
 
         targetDesktop = 0
 
-        for item in counters['pcSearch']:
+        for item in pcSearch:
             targetDesktop += item.get('pointProgressMax', 0)
         # logging.info(f"[BING] targetDesktop: {targetDesktop}, progressDesktop: {progressDesktop}")
 
         remainingDesktop = int((targetDesktop - progressDesktop) / searchPoints)
         remainingMobile = 0
-        if dashboard["userStatus"]["levelInfo"]["activeLevel"] != "Level1":
-            progressMobile = counters["mobileSearch"][0]["pointProgress"]
-            targetMobile = counters["mobileSearch"][0]["pointProgressMax"]
+        if fields["userStatus.levelInfo.activeLevel"] != "Level1":
+            mobileSearch = fields["userStatus.counters.mobileSearch"]
+            progressMobile = mobileSearch[0]["pointProgress"]
+            targetMobile = mobileSearch[0]["pointProgressMax"]
             remainingMobile = int((targetMobile - progressMobile) / searchPoints)
         return remainingDesktop, remainingMobile
 
@@ -0,0 +1,245 @@
+import logging
+import time
+from typing import Optional, Sequence, Tuple
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    ScriptTimeoutException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from src import tracing
+
+LOG_TAG = "[CMY][WAIT]"
+
+# 没有新的资源请求持续多久视为网络空闲（毫秒）
+NETWORK_IDLE_MS = 500
+# execute_async_script的超时时间比等待时间多出的余量（秒）
+SCRIPT_TIMEOUT_MARGIN = 5
+# 无法读取WebDriver当前的脚本超时时间时恢复为该值（WebDriver的默认值，秒）
+DEFAULT_SCRIPT_TIMEOUT = 30
+# 等待脚本执行时可以重试的异常：页面跳转导致脚本中断（document unloaded）、脚本超时、元素已失效。
+# 其他异常（例如会话失效、浏览器已关闭）重试也不会成功，直接抛出
+RETRYABLE_ERRORS = (
+    JavascriptException,
+    ScriptTimeoutException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+# 在页面中查找元素的函数，与selenium的定位方式对应
+FIND_ELEMENT_JS = """
+function findElement(by, selector) {
+    switch (by) {
+        case "id": return document.getElementById(selector);
+        case "class name": return document.getElementsByClassName(selector)[0] || null;
+        case "name": return document.getElementsByName(selector)[0] || null;
+        case "tag name": return document.getElementsByTagName(selector)[0] || null;
+        case "xpath":
+            return document.evaluate(
+                selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+        default: return document.querySelector(selector);
+    }
+}
+function findElements(by, selector) {
+    switch (by) {
+        case "id": {
+            const element = document.getElementById(selector);
+            return element ? [element] : [];
+        }
+        case "class name": return Array.from(document.getElementsByClassName(selector));
+        case "name": return Array.from(document.getElementsByName(selector));
+        case "tag name": return Array.from(document.getElementsByTagName(selector));
+        case "xpath": {
+            const snapshot = document.evaluate(
+                selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+            );
+            const elements = [];
+            for (let i = 0; i < snapshot.snapshotLength; i++) elements.push(snapshot.snapshotItem(i));
+            return elements;
+        }
+        default: return Array.from(document.querySelectorAll(selector));
+    }
+}
+function isVisible(element) {
+    return !!(element.offsetWidth || element.offsetHeight || element.getClientRects().length);
+}
+"""
+
+# 等待页面的load事件，页面已经加载完成时立即返回
+LOAD_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const timeoutMs = arguments[0];
+if (document.readyState === "complete") { done(true); return; }
+const timer = setTimeout(() => done(false), timeoutMs);
+window.addEventListener("load", () => { clearTimeout(timer); done(true); }, { once: true });
+"""
+
+# 页面加载完成且一段时间内没有新的资源请求时返回
+NETWORK_IDLE_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const idleMs = arguments[0];
+const timeoutMs = arguments[1];
+const start = performance.now();
+let lastActivity = performance.now();
+const observer = new PerformanceObserver(() => { lastActivity = performance.now(); });
+observer.observe({ type: "resource", buffered: false });
+const timer = setInterval(() => {
+    const now = performance.now();
+    if (document.readyState === "complete" && now - lastActivity >= idleMs) {
+        clearInterval(timer); observer.disconnect(); done(true);
+    } else if (now - start >= timeoutMs) {
+        clearInterval(timer); observer.disconnect(); done(false);
+    }
+}, 100);
+"""
+
+# 用MutationObserver等待任意一个元素出现，返回出现的元素在列表中的序号，超时返回-1
+ELEMENTS_SCRIPT = FIND_ELEMENT_JS + """
+const done = arguments[arguments.length - 1];
+const locators = arguments[0];
+const visible = arguments[1];
+const timeoutMs = arguments[2];
+function check() {
+    for (let i = 0; i < locators.length; i++) {
+        const element = findElement(locators[i][0], locators[i][1]);
+        if (element && (!visible || isVisible(element))) return i;
+    }
+    return -1;
+}
+const found = check();
+if (found >= 0) { done(found); return; }
+let timer = null;
+let poll = null;
+const observer = new MutationObserver(() => {
+    const index = check();
+    if (index >= 0) { finish(index); }
+});
+function finish(index) {
+    observer.disconnect(); clearTimeout(timer); clearInterval(poll); done(index);
+}
+observer.observe(document.documentElement || document, {
+    childList: true, subtree: true, attributes: visible,
+});
+// 样式变化（例如通过CSS类切换显示）不一定触发DOM变化，低频轮询兜底
+poll = setInterval(() => { const index = check(); if (index >= 0) finish(index); }, 500);
+timer = setTimeout(() => finish(-1), timeoutMs);
+"""
+
+# 等待页面中的JS表达式为真，例如页面脚本定义的全局变量
+CONDITION_SCRIPT = """
+const done = arguments[arguments.length - 1];
+const condition = new Function("return (" + arguments[0] + ");");
+const timeoutMs = arguments[1];
+const start = performance.now();
+function check() {
+    try { if (condition()) return true; } catch (e) {}
+    return false;
+}
+if (check()) { done(true); return; }
+const timer = setInterval(() => {
+    if (check()) { clearInterval(timer); done(true); }
+    else if (performance.now() - start >= timeoutMs) { clearInterval(timer); done(false); }
+}, 100);
+"""
+
+
+class Deadline:
+    """等待的截止时间，多个步骤共享同一个截止时间时使用。"""
+
+    def __init__(self, seconds: float):
+        self.end = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.end - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+def _scriptTimeout(driver: WebDriver) -> float:
+    try:
+        return driver.timeouts.script
+    except Exception:  # pylint: disable=broad-except
+        return DEFAULT_SCRIPT_TIMEOUT
+
+
+def _runAsync(driver: WebDriver, script: str, timeout: float, *args):
+    """
+    执行等待脚本，剩余的等待时间（毫秒）作为最后一个参数传入，等待时间计入当前span的等待时间。
+    页面在等待期间跳转时脚本会被中断，此时在剩余时间内重新执行；
+    会话失效等无法通过重试恢复的异常直接抛出，不会一直重试到等待时间结束。
+    结束后恢复WebDriver原来的脚本超时时间，不影响其他execute_async_script调用。
+    """
+    deadline = Deadline(timeout)
+    start = time.perf_counter()
+    previousTimeout = _scriptTimeout(driver)
+    try:
+        while True:
+            remaining = deadline.remaining()
+            try:
+                driver.set_script_timeout(remaining + SCRIPT_TIMEOUT_MARGIN)
+                return driver.execute_async_script(script, *args, int(remaining * 1000))
+            except RETRYABLE_ERRORS as e:
+                if deadline.expired():
+                    logging.debug(f"{LOG_TAG} 等待脚本执行失败: {e}")
+                    return None
+                # 页面跳转中，稍后在新页面上重新等待
+                time.sleep(0.2)
+    finally:
+        try:
+            driver.set_script_timeout(previousTimeout)
+        except Exception as e:  # pylint: disable=broad-except
+            logging.debug(f"{LOG_TAG} 恢复脚本超时时间失败: {e}")
+        tracing.recordSleep(start, time.perf_counter() - start)
+
+
+def waitForLoad(driver: WebDriver, timeout: float = 10) -> bool:
+    """等待页面触发load事件（document.readyState为complete）。"""
+    return _runAsync(driver, LOAD_SCRIPT, timeout) is True
+
+
+def waitForNetworkIdle(
+    driver: WebDriver, timeout: float = 10, idleTime: float = NETWORK_IDLE_MS / 1000
+) -> bool:
+    """等待页面加载完成且idleTime秒内没有新的资源请求。"""
+    return _runAsync(driver, NETWORK_IDLE_SCRIPT, timeout, int(idleTime * 1000)) is True
+
+
+def waitForAny(
+    driver: WebDriver,
+    locators: Sequence[Tuple[str, str]],
+    timeout: float = 10,
+    visible: bool = False,
+) -> Optional[int]:
+    """
+    等待多个元素中的任意一个出现。
+
+    Args:
+        locators: (By, selector)的列表。
+        visible: 是否要求元素可见。
+
+    Returns:
+        Optional[int]: 出现的元素在locators中的序号，超时返回None。
+    """
+    index = _runAsync(
+        driver, ELEMENTS_SCRIPT, timeout, [list(locator) for locator in locators], visible
+    )
+    if isinstance(index, int) and index >= 0:
+        return index
+    return None
+
+
+def waitForElement(
+    driver: WebDriver, by: str, selector: str, timeout: float = 10, visible: bool = False
+) -> bool:
+    """等待元素出现，出现后立即返回True，超时返回False。"""
+    return waitForAny(driver, [(by, selector)], timeout, visible) is not None
+
+
+def waitForCondition(driver: WebDriver, expression: str, timeout: float = 10) -> bool:
+    """等待页面中的JS表达式为真，例如"typeof dashboard !== 'undefined'"。"""
+    return _runAsync(driver, CONDITION_SCRIPT, timeout, expression) is True